@@ -56,6 +56,10 @@ INSTALLED_APPS = [
     'tutorials',
     'storages',
     "blogs",
+    'core',
+    'search',
+    'tasks',
+    'mailer',
 ]
 
 MIDDLEWARE = [
@@ -67,6 +71,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so "view" time covers only the view and rendering; inert unless REQUEST_TIMING_ENABLED
+    'core.timing.RequestTimingMiddleware',
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -190,10 +196,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with a per-process user cache (user.authentication)
+        'user.authentication.CachedJWTAuthentication',
     ),
+    # Default size for core.pagination keyset pages; clients may pass ?page_size= (max 100)
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 20)),
 }
 
+# PAGE_SIZE is consumed by the per-view keyset paginators, not a global pagination class
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
+
+# Newest comments embedded in a topic detail response; the rest are paged via the comment list
+TOPIC_DETAIL_COMMENTS = int(os.getenv('TOPIC_DETAIL_COMMENTS', 10))
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -203,6 +218,18 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,               # Blacklist old refresh token
 }
 
+# Users authenticated by CachedJWTAuthentication are kept per process for up
+# to AUTH_USER_CACHE_TTL seconds. Invalidation stamps live in
+# AUTH_USER_CACHE_ALIAS; share it between processes (e.g. Redis) so password
+# and is_active changes apply everywhere at once rather than after the TTL.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))  # seconds
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 1024))  # users
+AUTH_USER_CACHE_ALIAS = 'default'
+
+# Blacklisted refresh-token jtis are cached here until they expire
+# (user.tokens); run `manage.py prune_tokens` daily to trim the token tables
+TOKEN_BLACKLIST_CACHE_ALIAS = 'default'
+
 
 # AWS S3
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
@@ -367,6 +394,85 @@ LOGGING = {
 }
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) in production.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'bytebodh'),
+    }
+}
+
+# Public read endpoints cached by core.cache.CachedResponseMixin
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))  # seconds
+
+
+# Buffered view counters (core.view_counts)
+# 'memory' keeps increments per process; 'cache' shares them through CACHES so
+# `manage.py flush_view_counts` can flush from outside the web workers.
+VIEW_COUNT_BUFFER = os.getenv('VIEW_COUNT_BUFFER', 'memory')
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 30))  # seconds, 0 disables the timer
+VIEW_COUNT_MODELS = ['tutorials.Topic', 'blogs.BlogPost']
+
+# Buffered UserActivity writer (tutorials.activity)
+ACTIVITY_FLUSH_INTERVAL = int(os.getenv('ACTIVITY_FLUSH_INTERVAL', 10))  # seconds, 0 disables the timer
+ACTIVITY_BATCH_SIZE = int(os.getenv('ACTIVITY_BATCH_SIZE', 500))  # rows per INSERT; a full buffer flushes early
+
+# Responsive image variants (core.images), generated when an image is saved
+# and backfilled with `manage.py generate_image_variants`
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,1280').split(',')]
+IMAGE_VARIANT_FORMATS = os.getenv('IMAGE_VARIANT_FORMATS', 'webp,avif').split(',')
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', 75))
+
+# CKEditor uploads are streamed into storage as they arrive (core.uploads);
+# bodies over the limit are cut off mid-stream. S3 multipart parts are the
+# only buffer, so worker memory stays at one part per upload.
+STREAMING_UPLOAD_MAX_SIZE = int(os.getenv('STREAMING_UPLOAD_MAX_SIZE', 10 * 1024 * 1024))  # bytes
+STREAMING_UPLOAD_PART_SIZE = int(os.getenv('STREAMING_UPLOAD_PART_SIZE', 8 * 1024 * 1024))  # bytes, S3 minimum is 5 MiB
+
+# Background tasks (tasks.queue), run by `manage.py run_worker`
+TASK_WORKER_THREADS = int(os.getenv('TASK_WORKER_THREADS', 4))
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', 1))  # seconds
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', 5))
+TASK_RETRY_BACKOFF = int(os.getenv('TASK_RETRY_BACKOFF', 30))  # seconds before the first retry, doubled per failure
+TASK_RETRY_BACKOFF_MAX = int(os.getenv('TASK_RETRY_BACKOFF_MAX', 3600))  # seconds
+TASK_LOCK_TIMEOUT = int(os.getenv('TASK_LOCK_TIMEOUT', 600))  # seconds before a running task counts as abandoned
+
+# Outbound mail (mailer.outbox), sent in batches over one SMTP connection
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 50))  # messages per connection
+MAIL_RATE_LIMIT = int(os.getenv('MAIL_RATE_LIMIT', 60))  # messages per minute, 0 for no cap
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', 3))
+
+# Sliding-window limits (core.ratelimit) for endpoints that are expensive or
+# easy to abuse, checked before authentication and hashing. Keys are 'ip' or a
+# request field; counters live in RATELIMIT_CACHE_ALIAS, which must be shared
+# between processes (e.g. Redis) for the limits to hold across workers.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True') == 'True'
+RATELIMIT_CACHE_ALIAS = 'default'
+# META key holding the client address; 'HTTP_X_FORWARDED_FOR' behind a proxy
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER', 'REMOTE_ADDR')
+RATELIMIT_RATES = {
+    'login': {'ip': '30/m', 'username': '5/m'},
+    'register': {'ip': '10/h', 'email': '3/h'},
+    'password_reset': {'ip': '10/h', 'email': '3/h'},
+    'contact': {'ip': '5/h'},
+}
+
+# Per-request query counts and SQL/serializer/view times (core.timing), logged to
+# 'backend'. The Server-Timing header exposes them to every client, so keep it off
+# in public deployments unless you are investigating.
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'False') == 'True'
+REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', 'False') == 'True'
+REQUEST_TIMING_SLOW_MS = int(os.getenv('REQUEST_TIMING_SLOW_MS', 1000))  # slower requests are logged as warnings
+REQUEST_TIMING_SLOW_QUERIES = int(os.getenv('REQUEST_TIMING_SLOW_QUERIES', 50))  # as are requests with more queries
+REQUEST_TIMING_SLOWEST_SQL = int(os.getenv('REQUEST_TIMING_SLOWEST_SQL', 3))  # statements included in that warning
+
+# Contact form submissions are mailed here (comma-separated); empty disables it
+CONTACT_NOTIFICATION_EMAILS = [e for e in os.getenv('CONTACT_NOTIFICATION_EMAILS', '').split(',') if e]
+
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'smtp.gmail.com'
 # EMAIL_PORT = 587
@@ -18,11 +18,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import ckeditor_upload
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('user.urls')),
+    # Streams uploads into storage; shadows the package's own upload view
+    path("ckeditor5/image_upload/", ckeditor_upload, name="ck_editor_5_upload_file"),
     path("ckeditor5/", include('django_ckeditor_5.urls')),
     path('api/', include('tutorials.urls')),
     path('api/', include('blogs.urls')),
+    path('api/', include('search.urls')),
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
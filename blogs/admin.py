@@ -17,6 +17,7 @@ class BlogPostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     list_filter = ['status', 'category', 'tags']
     search_fields = ['title', 'content']
+    readonly_fields = ['read_time', 'word_count']  # Computed from content on save
 
 
 # jobs/admin.py
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0003_jobnotification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-published_date', '-id'], name='blogpost_status_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobnotification',
+            index=models.Index(fields=['is_active', '-posted_on', '-id'], name='job_active_posted_idx'),
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.urls import reverse
 from django.utils.text import slugify
 from django_ckeditor_5.fields import CKEditor5Field
 from django.conf import settings    
+from core.models import DerivedContent
+from core.view_counts import record_view
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -45,28 +47,45 @@ class Tag(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
-class BlogPost(models.Model):
+class BlogPostQuerySet(models.QuerySet):
+    def list_mode(self):
+        """
+        Columns and relations used by BlogPostListSerializer, in a fixed
+        three queries per page: posts joined to category and author, then tags.
+        """
+        return self.select_related('category', 'author').prefetch_related('tags').only(
+            'id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_variants', 'views', 'read_time',
+            'published_date', 'is_featured', 'status',
+            'category__id', 'category__name', 'category__slug', 'author__id', 'author__username',
+        )
+
+
+class BlogPost(DerivedContent):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('published', 'Published'),
     )
+    content_field = 'content'
 
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     excerpt = models.TextField(max_length=300)
     content = CKEditor5Field('Content', config_name='extends')
     featured_image = models.ImageField(upload_to='blog/images/', blank=True, null=True)
+    # Resized WebP/AVIF copies of the featured image, maintained by core.images
+    featured_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='blog_posts')
     tags = models.ManyToManyField(Tag, blank=True, related_name='blog_posts')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='blog_posts')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     views = models.PositiveIntegerField(default=0)
-    read_time = models.PositiveIntegerField(help_text="Read time in minutes")
     published_date = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_featured = models.BooleanField(default=False)
 
+    objects = BlogPostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-published_date']
         indexes = [
@@ -74,6 +93,7 @@ class BlogPost(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['published_date']),
             models.Index(fields=['category']),
+            models.Index(fields=['status', '-published_date', '-id'], name='blogpost_status_published_idx'),
         ]
 
     def __str__(self):
@@ -88,8 +108,8 @@ class BlogPost(models.Model):
         return reverse('blog:post-detail', kwargs={'slug': self.slug})
 
     def increment_views(self):
-        self.views += 1
-        self.save(update_fields=['views'])
+        # Buffered; core.view_counts writes the total back in batches
+        self.views += record_view(self)
 
 
 class Contact(models.Model):
@@ -121,12 +141,13 @@ class Contact(models.Model):
     
 
 
-class JobNotification(models.Model):
+class JobNotification(DerivedContent):
     EXPERIENCE_LEVEL_CHOICES = [
         ('FRESHER', 'Fresher'),
         ('EXPERIENCED', 'Experienced'),
         ('ALL', 'All Levels'),
     ]
+    content_field = 'description'
 
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255)
@@ -141,6 +162,9 @@ class JobNotification(models.Model):
 
     class Meta:
         ordering = ['-posted_on']
+        indexes = [
+            models.Index(fields=['is_active', '-posted_on', '-id'], name='job_active_posted_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from mailer.outbox import queue_mail
+
+
+def notify_contact(contact):
+    """Tell the team about a contact form submission."""
+    if not settings.CONTACT_NOTIFICATION_EMAILS:
+        return
+    details = [
+        f"Name: {contact.name}",
+        f"Email: {contact.email}",
+        f"Phone: {contact.phone or '-'}",
+        f"Project type: {contact.get_project_type_display() or '-'}",
+        f"Budget: {contact.get_budget_display() or '-'}",
+        "",
+        contact.message,
+    ]
+    queue_mail(
+        f"New contact request from {contact.name}",
+        "\n".join(details),
+        settings.CONTACT_NOTIFICATION_EMAILS,
+        from_email="no-reply@yourdomain.com",
+    )
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsMixin
+from core.images import SrcsetField
 from .models import Category, Tag, BlogPost, Contact, JobNotification
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -11,15 +13,34 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name', 'slug', 'created_at']
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer()
     tags = TagSerializer(many=True)
     author = serializers.StringRelatedField()
     published_date = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    featured_image_srcset = SrcsetField('featured_image')
 
     class Meta:
         model = BlogPost
-        fields = ['id', 'title', 'slug', 'excerpt', 'content', 'featured_image', 'category', 'tags', 'author', 'status', 'views', 'read_time', 'published_date', 'created_at', 'updated_at', 'is_featured']
+        fields = ['id', 'title', 'slug', 'excerpt', 'content', 'featured_image', 'featured_image_srcset', 'category', 'tags', 'author', 'status', 'views', 'read_time', 'published_date', 'created_at', 'updated_at', 'is_featured']
+
+
+class CategorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'slug']
+
+class BlogPostListSerializer(serializers.ModelSerializer):
+    # Expects BlogPost.objects.list_mode(); content HTML is never loaded
+    category = CategorySummarySerializer()
+    tags = TagSerializer(many=True)
+    author = serializers.StringRelatedField()
+    published_date = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    featured_image_srcset = SrcsetField('featured_image')
+
+    class Meta:
+        model = BlogPost
+        fields = ['id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_srcset', 'category', 'tags', 'author', 'views', 'read_time', 'published_date', 'is_featured']
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -30,9 +51,9 @@ class ContactSerializer(serializers.ModelSerializer):
 class JobNotificationListSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobNotification
-        fields = ['id', 'title', 'company', 'location', 'experience_level', 'posted_on', 'last_date']
+        fields = ['id', 'title', 'company', 'location', 'experience_level', 'posted_on', 'last_date', 'summary']
 
 class JobNotificationDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobNotification
-        fields = '__all__'  # Show all details in detailed view
\ No newline at end of file
+        exclude = ['plain_text']  # Show all details in detailed view; the HTML already carries the text
\ No newline at end of file
@@ -0,0 +1,36 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate
+from core.images import refresh_variants
+from .models import BlogPost, Category, JobNotification, Tag
+
+
+# Registered before the invalidation receivers so caches never keep the old variants
+@receiver(post_save, sender=BlogPost)
+def refresh_featured_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_variants(instance, 'featured_image')
+
+
+@receiver([post_save, post_delete], sender=BlogPost)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_blog_posts(sender, **kwargs):
+    invalidate('blog_posts')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    # 'tags' also feeds BlogPostDetailView's ETag, since Tag has no updated_at
+    invalidate('tags', 'blog_posts')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+    # Posts embed their category
+    invalidate('categories', 'blog_posts')
+
+
+@receiver([post_save, post_delete], sender=JobNotification)
+def invalidate_jobs(sender, **kwargs):
+    invalidate('jobs')
@@ -1,3 +1,149 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core import view_counts
+from core.cache import response_cache
+from .models import BlogPost, Category, Tag
+
+User = get_user_model()
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.reset_stats()
+        view_counts.reset_buffer()
+        self.addCleanup(view_counts.reset_buffer)
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass1234!')
+        self.category = Category.objects.create(name='Python')
+        self.post = BlogPost.objects.create(
+            title='Hello', slug='hello', excerpt='Hi', content='<p>Body</p>', category=self.category,
+            author=self.author, status='published', read_time=3,
+        )
+
+    def test_list_is_served_from_cache_until_invalidated(self):
+        url = reverse('blog-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        # Only the view counts are read
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.post.tags.add(Tag.objects.create(name='django'))
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['tags'][0]['name'], 'django')
+
+        self.category.name = 'Python 3'
+        self.category.save()
+        self.assertEqual(self.client.get(url).data['results'][0]['category']['name'], 'Python 3')
+
+        stats = response_cache.stats()['BlogPostListView']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 3))
+
+    def test_detail_counts_views_on_cache_hits(self):
+        url = reverse('blog-detail', kwargs={'slug': self.post.slug})
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['data']['views'], 2)
+
+        # Writing the counts back leaves the cached post alone
+        view_counts.flush()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['data']['views'], 3)
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_entries_are_kept_per_host(self):
+        BlogPost.objects.create(
+            title='Older', slug='older', excerpt='Hi', content='<p>Body</p>', category=self.category,
+            author=self.author, status='published', read_time=1,
+        )
+        url = reverse('blog-list')
+        self.client.get(url, {'page_size': 1}, HTTP_HOST='a.example.com')
+        response = self.client.get(url, {'page_size': 1}, HTTP_HOST='b.example.com')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.data['next'].startswith('http://b.example.com/'))
+
+    def test_list_reads_view_counts_fresh_on_cache_hits(self):
+        url = reverse('blog-list')
+        self.client.get(url)
+        BlogPost.objects.filter(pk=self.post.pk).update(views=7)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['views'], 7)
+
+    def test_detail_not_modified_skips_body_but_counts_view(self):
+        url = reverse('blog-detail', kwargs={'slug': self.post.slug})
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(view_counts.pending_views(self.post), 2)
+
+        self.post.tags.add(Tag.objects.create(name='django'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class BlogPostPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counts.reset_buffer)
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass1234!')
+        self.category = Category.objects.create(name='Python', description='x' * 500)
+        self.tag = Tag.objects.create(name='django')
+
+    def make_posts(self, count):
+        for i in range(count):
+            post = BlogPost.objects.create(
+                title=f'Post {i}', slug=f'post-{self.category.blog_posts.count()}', excerpt='Hi',
+                content='<p>%s</p>' % ('word ' * 2000), category=self.category, author=self.author,
+                status='published',
+            )
+            post.tags.add(self.tag)
+
+    def test_list_skips_content_in_constant_queries(self):
+        url = reverse('blog-list')
+        self.make_posts(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        cache.clear()
+        self.make_posts(5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+
+        self.assertEqual(len(small), len(large))
+        self.assertFalse(any('"content"' in query['sql'] for query in large.captured_queries))
+        post = response.data['results'][0]
+        self.assertNotIn('content', post)
+        self.assertEqual(post['category'], {'id': self.category.pk, 'name': 'Python', 'slug': self.category.slug})
+        self.assertEqual(post['author'], 'author')
+        self.assertEqual(post['read_time'], 10)
+        self.assertEqual([tag['name'] for tag in post['tags']], ['django'])
+
+    def test_detail_fields_skip_relations_but_still_count_views(self):
+        self.make_posts(1)
+        post = BlogPost.objects.get()
+        url = reverse('blog-detail', kwargs={'slug': post.slug})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title,read_time'})
+
+        self.assertEqual(response.data['data'], {'title': 'Post 0', 'read_time': 10})
+        # validators, post; no tag prefetch and no joins
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('JOIN', queries.captured_queries[1]['sql'])
+        self.assertEqual(view_counts.pending_views(post), 1)
@@ -3,39 +3,96 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Category, BlogPost, JobNotification
-from .serializers import CategorySerializer, BlogPostSerializer, ContactSerializer, JobNotificationListSerializer, JobNotificationDetailSerializer
+from .serializers import CategorySerializer, BlogPostSerializer, BlogPostListSerializer, ContactSerializer, JobNotificationListSerializer, JobNotificationDetailSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
+from django.db.models import Count
+from core.cache import CachedResponseMixin, response_cache
+from core.conditional import ConditionalGetMixin, child_aggregate, latest
+from core.fieldsets import SparseQuerysetMixin
+from core.pagination import PublishedDatePagination, PostedOnPagination
+from core.ratelimit import rate_limited
+from core.view_counts import record
+from .notifications import notify_contact
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedResponseMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespaces = ('categories',)
 
-class BlogPostListView(generics.ListAPIView):
-    queryset = BlogPost.objects.filter(status='published')
-    serializer_class = BlogPostSerializer
+class BlogPostListView(CachedResponseMixin, generics.ListAPIView):
+    queryset = BlogPost.objects.filter(status='published').list_mode()
+    serializer_class = BlogPostListSerializer
+    pagination_class = PublishedDatePagination
+    cache_namespaces = ('blog_posts',)
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        posts = response.data['results'] if response.status_code == status.HTTP_200_OK else None
+        if posts:
+            # View counts change on every flush, so they are read fresh rather than cached with the page
+            views = dict(BlogPost.objects.filter(pk__in=[post['id'] for post in posts]).values_list('pk', 'views'))
+            response.data = {
+                **response.data,
+                'results': [{**post, 'views': views.get(post['id'], post['views'])} for post in posts],
+            }
+        return response
 
-class BlogPostDetailView(generics.RetrieveAPIView):
-    queryset = BlogPost.objects.filter(status='published')
+class BlogPostDetailView(SparseQuerysetMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
     serializer_class = BlogPostSerializer
     lookup_field = 'slug'
+    cache_namespaces = ('blog_posts',)
+
+    def get_queryset(self):
+        queryset = BlogPost.objects.filter(status='published')
+        for relation in ('category', 'author'):
+            if self.wants(relation):
+                queryset = queryset.select_related(relation)
+        if self.wants('tags'):
+            queryset = queryset.prefetch_related('tags')
+        return self.restrict_columns(queryset)
+
+    def get_validators(self):
+        row = BlogPost.objects.filter(status='published', slug=self.kwargs['slug']).values(
+            'pk', 'updated_at', 'category__updated_at', 'views'
+        ).annotate(
+            tags_total=child_aggregate(BlogPost.tags.through.objects, 'blogpost', Count('pk')),
+        ).first()
+        if row is None:
+            return None
+        # The payload may omit id; get() still needs it to count the view. The
+        # cached payload's view count may be stale, so get() uses this one
+        self.post_pk = row['pk']
+        self.post_views = row.pop('views')
+        # Tags have no updated_at; renames bump the 'tags' cache namespace instead
+        parts = sorted(row.items()) + [('tags', response_cache.versions(['tags']))]
+        # Adding or removing a tag leaves no timestamp behind
+        last_modified = None if self.wants('tags') else latest(row['updated_at'], row['category__updated_at'])
+        return row, last_modified, parts
+
+    def not_modified(self, row):
+        record(BlogPost, row['pk'])
 
     def get(self, request, *args, **kwargs):
-        # Get the blog post object
-        blog_post = self.get_object()
-        
-        # Increment the view count for the blog post
-        blog_post.increment_views()
-        
-        # Serialize the blog post data
-        serializer = self.get_serializer(blog_post)
-        
+        # The serialized post may come from the response cache
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        # Count the view on every hit, cached or not
+        blog_post = dict(response.data)
+        pending = record(BlogPost, self.post_pk)
+        if 'views' in blog_post:
+            blog_post['views'] = self.post_views + pending
+
         # Return the serialized data with a success message
-        return Response({
+        response.data = {
             'message': 'Blog post retrieved and view count incremented successfully.',
-            'data': serializer.data
-        }, status=status.HTTP_200_OK)
+            'data': blog_post
+        }
+        return response
 
+@rate_limited('contact')
 @api_view(['POST'])
 @permission_classes([AllowAny])  # Anyone can POST
 def contact_submit(request):
@@ -45,26 +102,33 @@ def contact_submit(request):
     """
     serializer = ContactSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        contact = serializer.save()
+        notify_contact(contact)
         return Response(
             {"message": "Thank you for contacting us! We’ll get back to you soon."},
             status=status.HTTP_201_CREATED
         )
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class JobNotificationListAPIView(generics.ListAPIView):
+class JobNotificationListAPIView(CachedResponseMixin, generics.ListAPIView):
     """
     List all active job notifications.
     """
-    queryset = JobNotification.objects.filter(is_active=True)
+    # Description and requirements HTML are only sent by the detail view
+    queryset = JobNotification.objects.filter(is_active=True).only(
+        'id', 'title', 'company', 'location', 'experience_level', 'posted_on', 'last_date', 'summary'
+    )
     serializer_class = JobNotificationListSerializer
     permission_classes = [AllowAny]
+    pagination_class = PostedOnPagination
+    cache_namespaces = ('jobs',)
 
-class JobNotificationDetailAPIView(generics.RetrieveAPIView):
+class JobNotificationDetailAPIView(CachedResponseMixin, generics.RetrieveAPIView):
     """
     Retrieve detailed info about a single job notification.
     """
     queryset = JobNotification.objects.filter(is_active=True)
     serializer_class = JobNotificationDetailSerializer
     permission_classes = [AllowAny]
-    lookup_field = 'id'
\ No newline at end of file
+    lookup_field = 'id'
+    cache_namespaces = ('jobs',)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Response cache for public read endpoints.
+
+Views opt in with ``CachedResponseMixin`` and name the namespaces their
+payload depends on. Entries are keyed by the request URL plus the current
+version of each namespace, so ``invalidate('blog_posts')`` (called from model
+signal receivers) makes every dependent entry unreachable in one cache write;
+stale entries simply age out. The backing cache is ``RESPONSE_CACHE_ALIAS``
+(local memory unless CACHES points elsewhere).
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+KEY_PREFIX = 'respcache'
+
+
+class ResponseCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+    def _version_key(self, namespace):
+        return f'{KEY_PREFIX}:ns:{namespace}'
+
+    def versions(self, namespaces):
+        keys = [self._version_key(ns) for ns in namespaces]
+        found = self.cache.get_many(keys)
+        return [found.get(key, 0) for key in keys]
+
+    def key_for(self, name, path, namespaces):
+        versions = '.'.join(map(str, self.versions(namespaces)))
+        digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+        return f'{KEY_PREFIX}:{name}:{digest}:{versions}'
+
+    def get(self, name, key):
+        data = self.cache.get(key)
+        self._count(name, 'hits' if data is not None else 'misses')
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.timeout)
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            key = self._version_key(namespace)
+            self.cache.add(key, 0, timeout=None)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr(); any new value is a new version.
+                self.cache.set(key, 1, timeout=None)
+            self._count(namespace, 'invalidations')
+
+    def _count(self, name, counter):
+        with self._lock:
+            self._stats[(name, counter)] += 1
+
+    def stats(self):
+        """{name: {'hits': n, 'misses': n, 'invalidations': n}} for this process."""
+        with self._lock:
+            result = {}
+            for (name, counter), value in self._stats.items():
+                result.setdefault(name, {})[counter] = value
+            return result
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+response_cache = ResponseCache()
+
+
+def invalidate(*namespaces):
+    response_cache.invalidate(*namespaces)
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from ``response_cache``. Only the serialized
+    ``response.data`` of 200 responses is stored, so content negotiation and
+    rendering still happen per request; the database and serializers do not.
+    """
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get(self, request, *args, **kwargs):
+        name = type(self).__name__
+        # Payloads embed absolute links (pagination), so the origin is part of the key
+        url = f'{request.scheme}://{request.get_host()}{request.get_full_path()}'
+        key = response_cache.key_for(name, url, self.get_cache_namespaces())
+        data = response_cache.get(name, key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+            response['X-Cache'] = 'MISS'
+        return response
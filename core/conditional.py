@@ -0,0 +1,66 @@
+import hashlib
+
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` with a 304 before the
+    object body is loaded or serialized.
+
+    Views implement ``get_validators()`` with a cheap ``.values()`` query that
+    returns ``(row, last_modified, etag_parts)``, or ``None`` when the object
+    does not exist (the view then answers as usual, e.g. with a 404). ``etag_parts`` must cover everything shown in the payload
+    that can change. ``last_modified`` may only be given when every such change
+    moves a timestamp forward; return ``None`` when the payload has aggregates
+    that deletions or untimed rows can change, so only the ETag validates.
+    View counts are left out, hence weak ETags.
+    """
+
+    def get_validators(self):
+        """Without validators every GET is answered in full, with no ETag."""
+        return None
+
+    def not_modified(self, row):
+        """Hook run when a 304 is returned, e.g. to still count the view."""
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        row, last_modified, parts = validators
+        etag = 'W/"%s"' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        elif response.status_code == 304:
+            self.not_modified(row)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+def latest(*timestamps):
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def child_aggregate(queryset, link, aggregate):
+    """
+    Correlated subquery computing ``aggregate`` over the rows of ``queryset``
+    whose ``link`` points at the outer row, for use in validator queries.
+    """
+    return Subquery(
+        queryset.filter(**{link: OuterRef('pk')})
+        .order_by()
+        .values(link)
+        .annotate(value=aggregate)
+        .values('value')
+    )
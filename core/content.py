@@ -0,0 +1,85 @@
+"""
+Plain-text derivatives of rich-text (CKEditor) HTML.
+
+``derive()`` turns stored HTML into the values kept on ``DerivedContent``
+models: readable plain text (block elements become whitespace, ``<script>``
+and ``<style>`` bodies are dropped, entities are decoded), a word count, a
+read time in whole minutes, and a summary cut at a word boundary.
+"""
+import math
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+
+WORDS_PER_MINUTE = 200
+SUMMARY_LENGTH = 300
+
+WHITESPACE = re.compile(r'\s+')
+WORD = re.compile(r'\w+', re.UNICODE)
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption',
+    'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p',
+    'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+}
+SKIPPED_TAGS = {'script', 'style', 'template'}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skipping = max(self.skipping - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    if not html:
+        return ''
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return WHITESPACE.sub(' ', ''.join(parser.parts)).strip()
+
+
+def summarize(text, length=SUMMARY_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if not text[length - 1].isspace() and ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:-') + '…'
+
+
+@dataclass(frozen=True)
+class Derived:
+    plain_text: str
+    word_count: int
+    read_time: int
+    summary: str
+
+
+def derive(html):
+    text = html_to_text(html)
+    words = len(WORD.findall(text))
+    return Derived(
+        plain_text=text,
+        word_count=words,
+        read_time=max(1, math.ceil(words / WORDS_PER_MINUTE)),
+        summary=summarize(text),
+    )
@@ -0,0 +1,103 @@
+"""
+Sparse fieldsets: ``?fields=a,b`` keeps only the named top-level fields of a
+detail payload, ``?omit=c`` drops fields. Unknown names are ignored.
+
+``SparseFieldsMixin`` trims the serializer. ``SparseQuerysetMixin`` lets the
+view build only what the selection needs: ``wants(name)`` guards prefetches,
+joins and annotations, and ``restrict_columns(queryset)`` applies ``only()``
+with the columns behind the selected fields.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _names(request, param):
+    value = request.query_params.get(param) if request is not None else None
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def selected_fields(request, available):
+    """The subset of ``available`` field names the request asks for."""
+    selected = set(available)
+    fields = _names(request, FIELDS_PARAM)
+    if fields is not None:
+        selected &= fields
+    omit = _names(request, OMIT_PARAM)
+    if omit:
+        selected -= omit
+    return selected
+
+
+def model_columns(serializer, names):
+    """
+    ``only()`` paths for the model columns that ``names`` read. Nested
+    serializers contribute ``<relation>__<column>`` paths, to-many fields are
+    left to their prefetch, and fields that read annotations or methods need
+    no column. ``Meta.sparse_columns`` overrides the paths for a field.
+    """
+    model = serializer.Meta.model
+    overrides = getattr(serializer.Meta, 'sparse_columns', {})
+    fields = serializer.get_fields()
+    columns = {model._meta.pk.name}
+    for name in names:
+        if name in overrides:
+            columns.update(overrides[name])
+            continue
+        field = fields[name]
+        # Unbound fields only know an explicit source
+        source = field.source or name
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)) or source == '*':
+            continue
+        relation, _, rest = source.partition('.')
+        try:
+            model_field = model._meta.get_field(relation)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.concrete:
+            continue
+        if isinstance(field, serializers.ModelSerializer):
+            nested = model_columns(field, field.get_fields())
+            columns.update(f'{relation}__{column}' for column in nested)
+        elif rest:
+            columns.add(f"{relation}__{rest.replace('.', '__')}")
+        else:
+            columns.add(relation)
+    return columns
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin. Only the serializer built by the view (the one that gets
+    the request in its context) is trimmed; nested serializers keep every field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        for name in set(self.fields) - selected_fields(request, self.fields):
+            self.fields.pop(name)
+
+
+class SparseQuerysetMixin:
+    """View mixin pairing a ``SparseFieldsMixin`` serializer with its queryset."""
+
+    def get_selected_fields(self):
+        if not hasattr(self, '_selected_fields'):
+            # get_fields() rather than .fields: every declared field, before any trimming
+            available = self.get_serializer_class()().get_fields()
+            self._selected_fields = selected_fields(self.request, available)
+        return self._selected_fields
+
+    def wants(self, name):
+        return name in self.get_selected_fields()
+
+    def restrict_columns(self, queryset):
+        serializer = self.get_serializer_class()()
+        return queryset.only(*model_columns(serializer, self.get_selected_fields()))
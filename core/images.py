@@ -0,0 +1,164 @@
+"""
+Responsive variants of uploaded images.
+
+A model opts in by pairing an ``ImageField`` named ``<field>`` with a
+``JSONField`` named ``<field>_variants`` and calling ``refresh_variants()``
+after save (see the post_save receivers in blogs/tutorials ``signals``).
+Resized WebP/AVIF copies are written through the field's storage next to the
+original, as ``<name>_<width>w.<format>``, and described in the JSON column::
+
+    {"source": "tutorial_thumbnails/py.png", "width": 1920, "height": 1080,
+     "webp": [[320, "tutorial_thumbnails/py_320w.webp"], ...], "avif": [...]}
+
+so serializers can build ``srcset`` strings without touching storage.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+from rest_framework import serializers
+
+logger = logging.getLogger('backend')
+
+VARIANTS_SUFFIX = '_variants'
+# Pillow save() options per output format
+ENCODER_OPTIONS = {
+    'webp': {'method': 4},
+    'avif': {'speed': 8},
+}
+
+
+def variant_widths():
+    return sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', [320, 640, 1280]))
+
+
+def variant_formats():
+    """Configured formats this Pillow build can encode."""
+    formats = getattr(settings, 'IMAGE_VARIANT_FORMATS', ['webp', 'avif'])
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def target_widths(source_width, widths):
+    """Configured widths below the original, plus the original capped at the largest one."""
+    if not widths:
+        return []
+    return sorted({width for width in widths if width < source_width} | {min(source_width, widths[-1])})
+
+
+def variant_name(name, width, fmt):
+    return f'{os.path.splitext(name)[0]}_{width}w.{fmt}'
+
+
+def _load(field_file):
+    with field_file.storage.open(field_file.name, 'rb') as fh:
+        image = Image.open(fh)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image
+
+
+def build_variants(field_file, widths=None, formats=None):
+    """
+    Encode and store every variant of ``field_file``; returns the JSON
+    description. Touches only storage, never the database, so it is safe to
+    run in worker threads.
+    """
+    widths = variant_widths() if widths is None else widths
+    formats = variant_formats() if formats is None else formats
+    quality = getattr(settings, 'IMAGE_VARIANT_QUALITY', 75)
+    storage = field_file.storage
+
+    image = _load(field_file)
+    variants = {'source': field_file.name, 'width': image.width, 'height': image.height}
+    for fmt in formats:
+        variants[fmt] = []
+    for width in target_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=quality, **ENCODER_OPTIONS.get(fmt, {}))
+            name = variant_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[fmt].append([width, storage.save(name, ContentFile(buffer.getvalue()))])
+    return variants
+
+
+def variant_files(variants):
+    return [name for key, value in variants.items() if isinstance(value, list) for _, name in value]
+
+
+def delete_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning("Could not delete image variant %s", name, exc_info=True)
+
+
+def compute_variants(field_file):
+    """``build_variants()`` that degrades to a bare description on unreadable files."""
+    if not field_file.name:
+        return {}
+    try:
+        return build_variants(field_file)
+    except (OSError, Image.DecompressionBombError):
+        # Not an image Pillow can read; the original is still served
+        logger.warning("Could not build variants for %s", field_file.name, exc_info=True)
+        return {'source': field_file.name}
+
+
+def needs_refresh(instance, field_name):
+    current = getattr(instance, field_name + VARIANTS_SUFFIX) or {}
+    return current.get('source') != (getattr(instance, field_name).name or None)
+
+
+def store_variants(instance, field_name, variants):
+    """
+    Save ``variants`` on ``instance`` and delete files of the previous set.
+    Writes the column with a queryset update so ``save()`` and its signals do
+    not run again.
+    """
+    column = field_name + VARIANTS_SUFFIX
+    current = getattr(instance, column) or {}
+    storage = getattr(instance, field_name).storage
+    delete_files(storage, set(variant_files(current)) - set(variant_files(variants)))
+    setattr(instance, column, variants)
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{column: variants})
+
+
+def refresh_variants(instance, field_name, force=False):
+    """Rebuild the variants if the image changed (or ``force``); returns True if it did."""
+    if not force and not needs_refresh(instance, field_name):
+        return False
+    store_variants(instance, field_name, compute_variants(getattr(instance, field_name)))
+    return True
+
+
+class SrcsetField(serializers.Field):
+    """
+    Read-only ``{"webp": "<url> 320w, <url> 640w", "avif": ...}`` for an
+    image's variants column, or ``None`` before any have been generated.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', image_field + VARIANTS_SUFFIX)
+        self.image_field = image_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        srcset = {
+            fmt: ', '.join(f'{storage.url(name)} {width}w' for width, name in entries)
+            for fmt, entries in (variants or {}).items()
+            if isinstance(entries, list) and entries
+        }
+        return srcset or None
@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import DerivedContent
+
+
+class Command(BaseCommand):
+    help = "Recompute plain text, word count, read time and summary for rich-text models."
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.Model', help="Defaults to every DerivedContent model.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--missing-only', action='store_true', help="Skip rows that already have plain text.")
+
+    def handle(self, *args, **options):
+        derived_models = [model for model in apps.get_models() if issubclass(model, DerivedContent)]
+        if options['models']:
+            try:
+                selected = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(exc)
+            unknown = [model._meta.label for model in selected if model not in derived_models]
+            if unknown:
+                raise CommandError(f"No derived content on: {', '.join(unknown)}")
+            derived_models = selected
+
+        for model in derived_models:
+            done = self.backfill(model, options['batch_size'], options['missing_only'])
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.label}: {done} row(s) updated."))
+
+    def backfill(self, model, batch_size, missing_only):
+        rows = model._default_manager.only('pk', model.content_field).order_by('pk')
+        if missing_only:
+            rows = rows.filter(plain_text='')
+
+        done = 0
+        batch = []
+        # bulk_update skips save(), so updated_at (and with it Last-Modified) is untouched
+        for obj in rows.iterator(chunk_size=batch_size):
+            obj.refresh_derived_content()
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model._default_manager.bulk_update(batch, model.DERIVED_FIELDS)
+                done += len(batch)
+                batch = []
+                self.stderr.write(f"{model._meta.label}: {done} rows...")
+        model._default_manager.bulk_update(batch, model.DERIVED_FIELDS)
+        return done + len(batch)
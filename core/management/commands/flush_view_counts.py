@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import view_counts
+
+
+class Command(BaseCommand):
+    help = "Write buffered view counts back to the database."
+
+    def handle(self, *args, **options):
+        updated = view_counts.flush()
+        self.stdout.write(self.style.SUCCESS(f"{updated} row(s) updated."))
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from core.images import VARIANTS_SUFFIX, compute_variants, needs_refresh, store_variants
+
+
+def image_fields():
+    """(model, field name) for every ImageField with a ``<field>_variants`` column."""
+    for model in apps.get_models():
+        names = {field.name for field in model._meta.get_fields()}
+        for field in model._meta.get_fields():
+            if isinstance(field, models.ImageField) and field.name + VARIANTS_SUFFIX in names:
+                yield model, field.name
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/AVIF variants for existing images, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.Model', help="Defaults to every model with image variants.")
+        parser.add_argument('--workers', type=int, default=4, help="Images encoded and uploaded concurrently.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that are already current.")
+
+    def handle(self, *args, **options):
+        targets = list(image_fields())
+        if options['models']:
+            try:
+                selected = {apps.get_model(label) for label in options['models']}
+            except (LookupError, ValueError) as exc:
+                raise CommandError(exc)
+            targets = [(model, field) for model, field in targets if model in selected]
+            if not targets:
+                raise CommandError("None of those models have image variants.")
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for model, field in targets:
+                done = self.backfill(executor, model, field, options['batch_size'], options['force'])
+                self.stdout.write(self.style.SUCCESS(f"{model._meta.label}.{field}: {done} image(s) processed."))
+
+    def backfill(self, executor, model, field, batch_size, force):
+        rows = (
+            model._default_manager.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            .only('pk', field, field + VARIANTS_SUFFIX)
+            .order_by('pk')
+        )
+        done = 0
+        batch = []
+        for obj in rows.iterator(chunk_size=batch_size):
+            if force or needs_refresh(obj, field):
+                batch.append(obj)
+            if len(batch) >= batch_size:
+                done += self.process(executor, batch, field)
+                batch = []
+        return done + self.process(executor, batch, field)
+
+    def process(self, executor, batch, field):
+        # Workers only read and write storage; rows are updated from this thread,
+        # so the command holds a single database connection.
+        results = executor.map(lambda obj: compute_variants(getattr(obj, field)), batch)
+        for obj, variants in zip(batch, results):
+            store_variants(obj, field, variants)
+        if batch:
+            self.stderr.write(f"{type(batch[0])._meta.label}: {len(batch)} image(s) stored...")
+        return len(batch)
@@ -0,0 +1,36 @@
+from django.db import models
+
+from .content import SUMMARY_LENGTH, derive
+
+
+class DerivedContent(models.Model):
+    """
+    Abstract base for models with one rich-text field (``content_field``).
+    Its plain text, word count, read time and summary are recomputed on every
+    save that writes the field, so list endpoints can serve ``summary``
+    without loading the HTML. Bulk writes should call
+    ``refresh_derived_content()`` themselves.
+    """
+    DERIVED_FIELDS = ('plain_text', 'word_count', 'read_time', 'summary')
+    content_field = None
+
+    plain_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    read_time = models.PositiveIntegerField(default=1, editable=False, help_text="Read time in minutes")
+    summary = models.CharField(max_length=SUMMARY_LENGTH, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def refresh_derived_content(self):
+        derived = derive(getattr(self, self.content_field))
+        for field in self.DERIVED_FIELDS:
+            setattr(self, field, getattr(derived, field))
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.content_field in update_fields:
+            self.refresh_derived_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.DERIVED_FIELDS}
+        return super().save(*args, **kwargs)
@@ -0,0 +1,129 @@
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination.
+
+    The cursor carries the ordering values of the last row on the page, and
+    the next page is fetched with ``WHERE (a, id) < (:a, :id)`` spelled out as
+    ``a < :a OR (a = :a AND id < :id)``. With an index matching ``ordering``
+    every page is an index range scan, so page N costs the same as page 1.
+    The last ordering field must be unique (normally ``id``).
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Absolute URL the `next` link points at; defaults to the current request's URL.
+    base_url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.position_of(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        if not self.page_size_query_param:
+            return self.page_size
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.base_url or self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    # -- cursor helpers ----------------------------------------------------
+
+    def fields(self):
+        opts = self.model._meta
+        for name in self.ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            yield name, opts.pk if name == 'pk' else opts.get_field(name), descending
+
+    def position_of(self, obj):
+        return [getattr(obj, field.attname) for _, field, _ in self.fields()]
+
+    def after(self, position):
+        """Build ``(a, b, ...) > position`` respecting each field's direction."""
+        condition = Q()
+        equal = Q()
+        for (name, _, descending), value in zip(self.fields(), position):
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            values = json.loads(raw)
+            fields = list(self.fields())
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for (_, field, _), value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class CreatedAtPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class PublishedDatePagination(KeysetPagination):
+    ordering = ('-published_date', '-id')
+
+
+class PostedOnPagination(KeysetPagination):
+    ordering = ('-posted_on', '-id')
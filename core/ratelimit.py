@@ -0,0 +1,185 @@
+"""
+Sliding-window rate limits for expensive public endpoints.
+
+Limits are checked in ``dispatch()`` (``RateLimitMixin``) or around the view
+function (``rate_limited``), so a rejected request never reaches DRF's
+authentication, the serializer, password hashing or the database. Each scope
+in ``RATELIMIT_RATES`` maps ``'ip'`` and/or request field names to a rate::
+
+    RATELIMIT_RATES = {'login': {'ip': '20/m', 'username': '5/m'}}
+
+Field values (e.g. the username being tried) are read from the JSON or form
+body, so one address cannot spread attempts across many IPs unnoticed.
+
+Counters live in ``RATELIMIT_CACHE_ALIAS`` and are shared by every process.
+Each key keeps one counter per fixed window. The count of the previous window
+is weighted by how much of it still overlaps the sliding window, which gives
+a close approximation of a true sliding log with two integers per key.
+"""
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+logger = logging.getLogger('backend')
+
+KEY_PREFIX = 'ratelimit'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60); the period may also be spelled out ('5/min', '100/hour')."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period.strip()[0].lower()]
+
+
+def client_ip(request):
+    header = getattr(settings, 'RATELIMIT_IP_HEADER', 'REMOTE_ADDR')
+    value = request.META.get(header) or request.META.get('REMOTE_ADDR', '')
+    # X-Forwarded-For: the last entry was added by our own proxy; earlier ones are client-supplied
+    return value.rsplit(',', 1)[-1].strip()
+
+
+def request_field(request, name):
+    if not hasattr(request, '_ratelimit_data'):
+        data = {}
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except (ValueError, UnicodeDecodeError):
+                pass
+            if not isinstance(data, dict):
+                data = {}
+        elif request.method == 'POST':
+            data = request.POST
+        request._ratelimit_data = data
+    value = request._ratelimit_data.get(name)
+    return str(value).strip().lower() if value else ''
+
+
+class RateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RATELIMIT_CACHE_ALIAS', 'default')]
+
+    def rules(self, scope):
+        return [(key, *parse_rate(rate)) for key, rate in getattr(settings, 'RATELIMIT_RATES', {}).get(scope, {}).items() if rate]
+
+    def _key(self, scope, kind, value, window):
+        digest = hashlib.md5(value.encode('utf-8')).hexdigest()
+        return f'{KEY_PREFIX}:{scope}:{kind}:{digest}:{window}'
+
+    def check(self, scope, request, now=None):
+        """
+        Count the request against every rule of ``scope``. Returns ``None``
+        if it may proceed, else ``(rule, seconds until retry)``; rejected
+        requests are not counted.
+        """
+        if not getattr(settings, 'RATELIMIT_ENABLED', True):
+            return None
+        now = time.time() if now is None else now
+        checks = []
+        for kind, limit, period in self.rules(scope):
+            value = client_ip(request) if kind == 'ip' else request_field(request, kind)
+            if not value:
+                continue
+            window, offset = divmod(now, period)
+            current = self._key(scope, kind, value, int(window))
+            previous = self._key(scope, kind, value, int(window) - 1)
+            checks.append((kind, limit, period, offset / period, current, previous))
+        if not checks:
+            return None
+
+        counts = self.cache.get_many([key for check in checks for key in check[4:]])
+        for kind, limit, period, elapsed, current, previous in checks:
+            in_window, before = counts.get(current, 0), counts.get(previous, 0)
+            if before * (1 - elapsed) + in_window >= limit:
+                self._count(scope, f'rejected_{kind}')
+                return kind, self.retry_after(limit, period, elapsed, in_window, before)
+
+        for kind, limit, period, elapsed, current, previous in checks:
+            # Kept for two windows: this one, then as the next one's "previous"
+            self.cache.add(current, 0, timeout=2 * period)
+            try:
+                self.cache.incr(current)
+            except ValueError:
+                self.cache.set(current, 1, timeout=2 * period)
+        self._count(scope, 'allowed')
+        return None
+
+    def retry_after(self, limit, period, elapsed, in_window, before):
+        if in_window < limit and before:
+            # The previous window's weight has to fall until one more request fits
+            wait = 1 - (limit - in_window) / before - elapsed
+        else:
+            wait = 1 - elapsed
+        return max(1, math.ceil(wait * period))
+
+    def _count(self, scope, counter):
+        with self._lock:
+            self._stats[(scope, counter)] += 1
+
+    def stats(self):
+        """{scope: {'allowed': n, 'rejected_<rule>': n}} for this process."""
+        with self._lock:
+            result = {}
+            for (scope, counter), value in self._stats.items():
+                result.setdefault(scope, {})[counter] = value
+            return result
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+rate_limiter = RateLimiter()
+
+
+def limit_response(scope, request):
+    rejected = rate_limiter.check(scope, request)
+    if rejected is None:
+        return None
+    kind, wait = rejected
+    logger.warning("Rate limit %s/%s hit: ip=%s path=%s", scope, kind, client_ip(request), request.path)
+    response = JsonResponse({'detail': f"Request was throttled. Expected available in {wait} seconds."}, status=429)
+    response['Retry-After'] = str(wait)
+    return response
+
+
+class RateLimitMixin:
+    """For DRF class-based views; checks ``rate_limit_scope`` before DRF sets up the request."""
+    rate_limit_scope = None
+    rate_limit_methods = ('POST',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in self.rate_limit_methods:
+            response = limit_response(self.rate_limit_scope, request)
+            if response is not None:
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+
+def rate_limited(scope, methods=('POST',)):
+    """The same check for function views; goes outside ``@api_view``."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                response = limit_response(scope, request)
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,92 @@
+import re
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+
+def _base_slug(model, source, field):
+    max_length = model._meta.get_field(field).max_length
+    # Leave room for a "-<n>" suffix
+    base = slugify(source or '')[:max_length - 6].strip('-')
+    return base or model._meta.model_name
+
+
+def _taken_suffixes(model, bases, field):
+    """
+    {base: set of suffixes in use} for every base, in a single query. A bare
+    base counts as suffix 0. ``startswith`` narrows the scan through the
+    slug index before the regex discards unrelated rows.
+    """
+    taken = defaultdict(set)
+    if not bases:
+        return taken
+    pattern = '^(%s)(-[0-9]+)?$' % '|'.join(re.escape(base) for base in bases)
+    lookup = model._default_manager.none()
+    for base in bases:
+        lookup |= model._default_manager.filter(**{f'{field}__startswith': base})
+    for slug in lookup.filter(**{f'{field}__regex': pattern}).values_list(field, flat=True):
+        base, _, suffix = slug.rpartition('-')
+        if base in bases and suffix.isdigit():
+            taken[base].add(int(suffix))
+        if slug in bases:
+            taken[slug].add(0)
+    return taken
+
+
+def _next_free(base, taken):
+    if 0 not in taken:
+        return base
+    return f'{base}-{max(taken) + 1}'
+
+
+def allocate_slug(instance, source, field='slug'):
+    """Next free ``<slugified source>[-n]`` for ``instance``'s model, in one query."""
+    model = type(instance)
+    base = _base_slug(model, source, field)
+    return _next_free(base, _taken_suffixes(model, {base}, field)[base])
+
+
+def allocate_slugs(instances, source_attr, field='slug'):
+    """
+    Fill ``field`` on every instance that has none, for ``bulk_create``.
+    Slugs are unique within the batch and against the table as of one query.
+    """
+    pending = [obj for obj in instances if not getattr(obj, field)]
+    if not pending:
+        return instances
+    model = type(pending[0])
+    bases = {id(obj): _base_slug(model, getattr(obj, source_attr), field) for obj in pending}
+    taken = _taken_suffixes(model, set(bases.values()), field)
+    # Every full slug in use, so "Python 1" and the second "Python" cannot both get "python-1"
+    used = {f'{base}-{n}' if n else base for base, suffixes in taken.items() for n in suffixes}
+    for obj in pending:
+        base = bases[id(obj)]
+        slug = _next_free(base, taken[base])
+        while slug in used:
+            taken[base].add(_suffix(base, slug))
+            slug = _next_free(base, taken[base])
+        taken[base].add(_suffix(base, slug))
+        used.add(slug)
+        setattr(obj, field, slug)
+    return instances
+
+
+def _suffix(base, slug):
+    return 0 if slug == base else int(slug.rpartition('-')[2])
+
+
+def save_with_unique_slug(instance, source, save, *args, field='slug', attempts=5, **kwargs):
+    """
+    Allocate a slug and call ``save``; if a concurrent insert claimed the same
+    slug first, allocate again and retry.
+    """
+    for attempt in range(attempts):
+        setattr(instance, field, allocate_slug(instance, source, field))
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            slug_taken = type(instance)._default_manager.filter(**{field: getattr(instance, field)}).exists()
+            if not slug_taken or attempt == attempts - 1:
+                raise
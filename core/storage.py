@@ -0,0 +1,295 @@
+"""
+Content-addressed (deduplicating) file storage.
+
+``ContentAddressedMixin`` goes in front of any Django storage class. Uploads
+are hashed chunk by chunk and stored as ``<dir>/<aa>/<sha256><ext>``. If that
+object already exists, the save returns its name and nothing is uploaded.
+Only the upload's directory and extension are kept from the requested name.
+
+Objects can be shared by any number of references. ``delete()`` is therefore
+a no-op; unreferenced objects have to be collected separately.
+
+Savings are counted per process: see ``dedup_stats.stats()``.
+
+The streaming mixins accept uploads that ``core.uploads`` has already piped
+into the backend while the request was being read (a multipart upload on S3,
+a file on local disk). Saving such an upload moves the staged object into
+place; it is never read back or uploaded again.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from storages.utils import clean_name
+
+logger = logging.getLogger('backend')
+
+CONTENT_ADDRESS = re.compile(r'^[0-9a-f]{64}$')
+
+
+class DedupStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, size, duplicate):
+        with self._lock:
+            if duplicate:
+                self._counts['duplicates'] += 1
+                self._counts['bytes_saved'] += size
+            else:
+                self._counts['stored'] += 1
+                self._counts['bytes_stored'] += size
+            return self._counts['bytes_saved']
+
+    def stats(self):
+        """{'stored', 'bytes_stored', 'duplicates', 'bytes_saved'} for this process."""
+        with self._lock:
+            return {key: self._counts[key] for key in ('stored', 'bytes_stored', 'duplicates', 'bytes_saved')}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+dedup_stats = DedupStats()
+
+
+def hash_content(content):
+    """
+    (sha256 hex digest, size, readable file) in one pass over ``content``.
+    Staged uploads arrive already hashed. Seekable files are rewound and
+    reused; anything else is spooled while it is hashed, in memory up to
+    FILE_UPLOAD_MAX_MEMORY_SIZE.
+    """
+    if getattr(content, 'sha256', None):
+        return content.sha256, content.size, content
+    digest = hashlib.sha256()
+    size = 0
+    if content.seekable():
+        for chunk in content.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        content.seek(0)
+        return digest.hexdigest(), size, content
+
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return digest.hexdigest(), size, File(spool, name=content.name)
+
+
+class ContentAddressedMixin:
+    def content_name(self, name, digest):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension).replace('\\', '/')
+
+    def is_content_name(self, name):
+        return bool(CONTENT_ADDRESS.match(os.path.splitext(os.path.basename(name))[0]))
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name comes from the content in _save(), so there is nothing
+        # to probe yet. A content name only reaches here when a concurrent
+        # upload of the same bytes won the race; the backend may then pick a
+        # free name.
+        if self.is_content_name(name):
+            return super().get_available_name(name, max_length)
+        return name
+
+    def _save(self, name, content):
+        digest, size, content = hash_content(content)
+        target = self.content_name(name, digest)
+        if self.exists(target):
+            saved = dedup_stats.record(size, duplicate=True)
+            logger.info("Deduplicated upload %s -> %s (%d bytes saved, %d this process)", name, target, size, saved)
+            return target
+        dedup_stats.record(size, duplicate=False)
+        return super()._save(target, content)
+
+    def delete(self, name):
+        logger.debug("Kept shared object %s; content-addressed storage does not delete", name)
+
+
+STAGING_DIR = 'incoming'
+
+
+class StreamingUpload:
+    """
+    Receives an upload chunk by chunk. Subclasses write each chunk to the
+    backend; this base class tracks the digest and size. ``close()`` without
+    ``finish()`` aborts, which is how Django's parser cleans up after
+    StopUpload.
+    """
+
+    def __init__(self, staged_name):
+        self.staged_name = staged_name
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.finished = False
+
+    def write(self, chunk):
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        self._write(chunk)
+
+    def finish(self):
+        self._finish()
+        self.finished = True
+
+    def close(self):
+        if not self.finished:
+            self.abort()
+
+    @property
+    def sha256(self):
+        return self.digest.hexdigest()
+
+
+class LocalStreamingUpload(StreamingUpload):
+    def __init__(self, storage, staged_name):
+        super().__init__(staged_name)
+        self.path = storage.path(staged_name)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fh = open(self.path, 'wb')
+
+    def _write(self, chunk):
+        self.fh.write(chunk)
+
+    def _finish(self):
+        self.fh.close()
+
+    def abort(self):
+        self.fh.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.finished = True
+
+
+class S3MultipartUpload(StreamingUpload):
+    """
+    Chunks are collected into parts of ``part_size`` bytes (S3 needs at
+    least 5 MiB for every part but the last) and each part is uploaded as
+    soon as it fills. Memory use is one part, whatever the file size.
+    """
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, storage, staged_name, part_size):
+        super().__init__(staged_name)
+        self.client = storage.connection.meta.client
+        self.bucket = storage.bucket_name
+        self.key = storage.key_for(staged_name)
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.buffer = bytearray()
+        self.parts = []
+        self.upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)['UploadId']
+
+    def _write(self, chunk):
+        self.buffer += chunk
+        if len(self.buffer) >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=bytes(self.buffer),
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+        self.buffer = bytearray()
+
+    def _finish(self):
+        if self.buffer or not self.parts:
+            self._upload_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={'Parts': self.parts},
+        )
+
+    def abort(self):
+        self.buffer = bytearray()
+        self.finished = True
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        except Exception:
+            logger.warning("Could not abort multipart upload %s", self.key, exc_info=True)
+
+
+class StreamingStorageMixin:
+    """
+    Storage side of ``core.uploads.StreamingUploadHandler``. ``open_upload()``
+    starts a staged upload; saving the resulting file moves it into place.
+    """
+
+    def staged_name(self):
+        return f'{STAGING_DIR}/{uuid.uuid4().hex}'
+
+    def accepts_upload(self, content):
+        staged_storage = getattr(content, 'staged_storage', None)
+        return staged_storage is not None and self.same_backend(staged_storage)
+
+    def _save(self, name, content):
+        if not self.accepts_upload(content):
+            return super()._save(name, content)
+        self.adopt_upload(content, name)
+        content.adopted = True
+        return name
+
+
+class StreamingFileSystemMixin(StreamingStorageMixin):
+    def open_upload(self):
+        return LocalStreamingUpload(self, self.staged_name())
+
+    def same_backend(self, other):
+        return isinstance(other, FileSystemStorage) and other.location == self.location
+
+    def adopt_upload(self, content, name):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self.path(content.staged_name), path)
+
+    def discard_upload(self, staged_name):
+        if os.path.exists(self.path(staged_name)):
+            os.remove(self.path(staged_name))
+
+
+class StreamingS3Mixin(StreamingStorageMixin):
+    upload_part_size = 8 * 1024 * 1024
+
+    def key_for(self, name):
+        return self._normalize_name(clean_name(name))
+
+    def open_upload(self):
+        part_size = getattr(settings, 'STREAMING_UPLOAD_PART_SIZE', self.upload_part_size)
+        return S3MultipartUpload(self, self.staged_name(), part_size)
+
+    def same_backend(self, other):
+        return isinstance(other, StreamingS3Mixin) and other.bucket_name == self.bucket_name
+
+    def adopt_upload(self, content, name):
+        # Server-side copy: the bytes never pass through this process again
+        client = self.connection.meta.client
+        source = self.key_for(content.staged_name)
+        client.copy_object(
+            Bucket=self.bucket_name, Key=self.key_for(name),
+            CopySource={'Bucket': self.bucket_name, 'Key': source},
+            MetadataDirective='REPLACE',
+            **self._get_write_parameters(name, content),
+        )
+        client.delete_object(Bucket=self.bucket_name, Key=source)
+
+    def discard_upload(self, staged_name):
+        self.connection.meta.client.delete_object(Bucket=self.bucket_name, Key=self.key_for(staged_name))
+
+
+class DedupFileSystemStorage(ContentAddressedMixin, StreamingFileSystemMixin, FileSystemStorage):
+    pass
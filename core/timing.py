@@ -0,0 +1,142 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestTimingMiddleware`` wraps every database connection with
+``connection.execute_wrapper`` for the duration of a request and records:
+
+* ``db``: number of queries and the time spent executing them,
+* ``serializer``: time spent in top-level ``serializer.data`` (queries run
+  while serializing, e.g. lazy relations, count towards both),
+* ``view``: time spent below the middleware, i.e. the view and rendering.
+
+Each request is logged to ``backend``. Requests slower than
+``REQUEST_TIMING_SLOW_MS`` or running more than
+``REQUEST_TIMING_SLOW_QUERIES`` queries are logged as warnings together with
+their ``REQUEST_TIMING_SLOWEST_SQL`` slowest statements. With
+``REQUEST_TIMING_HEADER`` the numbers are also sent as a ``Server-Timing``
+header, which browser dev tools show next to the request.
+
+When ``REQUEST_TIMING_ENABLED`` is off the middleware raises
+``MiddlewareNotUsed`` and Django leaves it out of the chain entirely, and the
+serializer hook is never installed.
+"""
+import heapq
+import itertools
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('backend')
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self, keep_slowest=3):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.view_time = 0.0
+        self.serializing = False
+        self._keep = keep_slowest
+        self._slowest = []
+        self._seq = itertools.count()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - start)
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.sql_time += duration
+        if not self._keep:
+            return
+        # Min-heap of the N slowest; the sequence number breaks ties without comparing SQL
+        entry = (duration, next(self._seq), sql)
+        if len(self._slowest) < self._keep:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest(self):
+        """[(seconds, sql), ...], slowest first."""
+        return [(duration, sql) for duration, _, sql in sorted(self._slowest, reverse=True)]
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries", '
+            f'serializer;dur={self.serializer_time * 1000:.1f}, '
+            f'view;dur={self.view_time * 1000:.1f}'
+        )
+
+
+def _timed_data(fget):
+    def data(self):
+        timings = _current.get()
+        # Only the outermost serializer is timed; nested ones are part of it
+        if timings is None or timings.serializing:
+            return fget(self)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            timings.serializing = False
+            timings.serializer_time += time.perf_counter() - start
+    data._timed = True
+    return property(data)
+
+
+def install_serializer_timing():
+    # Serializer.data and ListSerializer.data both go through BaseSerializer.data
+    if not getattr(BaseSerializer.data.fget, '_timed', False):
+        BaseSerializer.data = _timed_data(BaseSerializer.data.fget)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        timings = RequestTimings(keep_slowest=getattr(settings, 'REQUEST_TIMING_SLOWEST_SQL', 3))
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            timings.view_time = time.perf_counter() - start
+            _current.reset(token)
+
+        if getattr(settings, 'REQUEST_TIMING_HEADER', False):
+            response['Server-Timing'] = timings.server_timing()
+        self.log(request, response, timings)
+        return response
+
+    def log(self, request, response, timings):
+        summary = "%s %s %s view=%.1fms db=%.1fms queries=%d serializer=%.1fms"
+        args = (
+            request.method, request.path, response.status_code, timings.view_time * 1000,
+            timings.sql_time * 1000, timings.queries, timings.serializer_time * 1000,
+        )
+        slow_ms = getattr(settings, 'REQUEST_TIMING_SLOW_MS', 1000)
+        slow_queries = getattr(settings, 'REQUEST_TIMING_SLOW_QUERIES', 50)
+        if timings.view_time * 1000 < slow_ms and timings.queries <= slow_queries:
+            logger.info(summary, *args)
+            return
+        statements = ''.join(f"\n  {duration * 1000:.1f}ms {sql}" for duration, sql in timings.slowest())
+        logger.warning("Slow request: " + summary + "%s", *args, statements)
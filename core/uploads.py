@@ -0,0 +1,129 @@
+"""
+Upload handler that streams file bodies straight into storage.
+
+Django's default handlers buffer each file in memory or in a temp file, and
+the storage then uploads it again. ``StreamingUploadHandler`` writes every
+chunk to a staged upload on the target storage (see
+``core.storage.StreamingStorageMixin``) as it is parsed. The size limit and
+the image check happen mid-stream, so oversized or non-image bodies are cut
+off without being read to the end. The view receives a
+``StagedUploadedFile``; saving it through the same storage moves the staged
+object into place.
+
+Upload handlers must be set before the body is parsed, and CsrfViewMiddleware
+parses it, so views using this handler are csrf_exempt and check CSRF
+themselves (see core.views.ckeditor_upload).
+"""
+import io
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+from PIL import Image, UnidentifiedImageError
+
+# Enough of the file for Pillow to identify any common image header, even
+# JPEGs carrying large EXIF/ICC segments before the frame header
+SNIFF_BYTES = 256 * 1024
+
+
+class StagedUploadedFile(UploadedFile):
+    """
+    An upload that already sits in ``staged_storage``. Reading it opens the
+    staged object lazily. Closing it deletes the staged object unless a
+    storage adopted it, so abandoned uploads do not linger.
+    """
+
+    def __init__(self, staged_storage, staged_name, name, content_type, size, charset, sha256, content_type_extra=None):
+        self._file = None
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.staged_storage = staged_storage
+        self.staged_name = staged_name
+        self.sha256 = sha256
+        self.adopted = False
+
+    @property
+    def file(self):
+        if self._file is None:
+            self._file = self.staged_storage.open(self.staged_name, 'rb')
+        return self._file
+
+    @file.setter
+    def file(self, value):
+        self._file = value
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not self.adopted:
+            self.staged_storage.discard_upload(self.staged_name)
+            self.adopted = True  # Nothing left to discard
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """
+    Takes every file in the request. ``rejection`` is ``(status, message)``
+    once a file was cut off, for the view to report.
+    """
+
+    def __init__(self, request, storage, max_size=None, images_only=True):
+        super().__init__(request)
+        self.storage = storage
+        self.max_size = max_size if max_size is not None else settings.STREAMING_UPLOAD_MAX_SIZE
+        self.images_only = images_only
+        self.rejection = None
+        self.declared_length = None
+        self.file = None
+
+    def reject(self, status, message):
+        self.rejection = (status, message)
+        # Named ``file`` so MultiPartParser._close_files() aborts it as well
+        if self.file is not None:
+            self.file.close()
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # new_file() refuses bodies whose declared length is already too big
+        self.declared_length = content_length
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.max_size and (self.declared_length or 0) > self.max_size + SNIFF_BYTES:
+            self.reject(413, self.too_large())
+        self.file = self.storage.open_upload()
+        self.head = b''
+        self.sniffed = not self.images_only
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.max_size and start + len(raw_data) > self.max_size:
+            self.reject(413, self.too_large())
+        if not self.sniffed:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.sniff()
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.sniffed:
+            self.sniff()
+        upload, self.file = self.file, None
+        upload.finish()
+        return StagedUploadedFile(
+            self.storage, upload.staged_name, self.file_name, self.content_type,
+            upload.size, self.charset, upload.sha256, self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        if self.file is not None:
+            self.file.close()
+
+    def sniff(self):
+        self.sniffed = True
+        try:
+            Image.open(io.BytesIO(self.head))
+        except (UnidentifiedImageError, OSError):
+            self.reject(400, "Upload a valid image. The file you uploaded was either not an image or a corrupted image.")
+
+    def too_large(self):
+        return f"File should be at most {self.max_size // (1024 * 1024)} MB."
@@ -0,0 +1,221 @@
+"""
+Write-behind buffer for ``views`` counters.
+
+Detail endpoints call ``record_view(instance)`` instead of saving the row on
+every GET. Increments are collected either in process memory or in the shared
+Django cache (``VIEW_COUNT_BUFFER = 'memory' | 'cache'``) and written back in
+batches of ``UPDATE ... SET views = views + n`` by ``flush()``, which runs on a
+background timer (``VIEW_COUNT_FLUSH_INTERVAL`` seconds, 0 disables it) and from
+``manage.py flush_view_counts``.
+
+The memory buffer is only visible to the process that collected it, so the
+management command can only flush the cache buffer; use a shared cache backend
+in production when flushing out of process.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+logger = logging.getLogger('backend')
+
+FIELD = 'views'
+
+# Sent with sender=<model> after buffered views for that model are written.
+flushed = Signal()
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+class MemoryBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+
+    def incr(self, label, pk, delta=1):
+        with self._lock:
+            self._pending[label][pk] += delta
+            return self._pending[label][pk]
+
+    def pending(self, label, pk):
+        with self._lock:
+            return self._pending[label].get(pk, 0)
+
+    def drain(self, label):
+        with self._lock:
+            return self._pending.pop(label, Counter())
+
+    def restore(self, label, counts):
+        with self._lock:
+            self._pending[label].update(counts)
+
+
+class CacheBuffer:
+    """
+    Per-row counters in the cache plus an append-only log of dirty primary
+    keys. A row is appended to the log when its ``mark`` key is first added;
+    the flusher deletes the mark before reading the counter, so increments
+    racing with a flush are either included or re-logged for the next one.
+    """
+    LOCK_TIMEOUT = 300
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def _key(self, label, *parts):
+        return ':'.join(['viewcount', label, *map(str, parts)])
+
+    def incr(self, label, pk, delta=1):
+        key = self._key(label, 'count', pk)
+        self.cache.add(key, 0, timeout=None)
+        value = self.cache.incr(key, delta)
+        if self.cache.add(self._key(label, 'mark', pk), 1, timeout=None):
+            seq_key = self._key(label, 'seq')
+            self.cache.add(seq_key, 0, timeout=None)
+            self.cache.set(self._key(label, 'log', self.cache.incr(seq_key)), pk, timeout=None)
+        return value
+
+    def pending(self, label, pk):
+        return self.cache.get(self._key(label, 'count', pk)) or 0
+
+    def drain(self, label):
+        lock_key = self._key(label, 'lock')
+        if not self.cache.add(lock_key, 1, timeout=self.LOCK_TIMEOUT):
+            return Counter()
+        try:
+            start = self.cache.get(self._key(label, 'flushed'), 0)
+            end = self.cache.get(self._key(label, 'seq'), 0)
+            if end <= start:
+                return Counter()
+            log_keys = [self._key(label, 'log', n) for n in range(start + 1, end + 1)]
+            pks = set(self.cache.get_many(log_keys).values())
+
+            counts = Counter()
+            for pk in pks:
+                self.cache.delete(self._key(label, 'mark', pk))
+                count_key = self._key(label, 'count', pk)
+                value = self.cache.get(count_key) or 0
+                if value:
+                    # decr rather than reset so increments since the read survive
+                    self.cache.decr(count_key, value)
+                    counts[pk] = value
+            self.cache.delete_many(log_keys)
+            self.cache.set(self._key(label, 'flushed'), end, timeout=None)
+            return counts
+        finally:
+            self.cache.delete(lock_key)
+
+    def restore(self, label, counts):
+        for pk, value in counts.items():
+            self.incr(label, pk, value)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_timer = None
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            if getattr(settings, 'VIEW_COUNT_BUFFER', 'memory') == 'cache':
+                _buffer = CacheBuffer(getattr(settings, 'VIEW_COUNT_CACHE_ALIAS', 'default'))
+            else:
+                _buffer = MemoryBuffer()
+        return _buffer
+
+
+def reset_buffer():
+    """Drop the buffer instance so the next call re-reads settings (tests)."""
+    global _buffer
+    with _buffer_lock:
+        _buffer = None
+
+
+def record_view(instance):
+    """
+    Count one view of ``instance`` and return how many views are buffered for
+    it, so callers can show ``instance.views + record_view(instance)``.
+    """
+    return record(type(instance), instance.pk)
+
+
+def record(model, pk):
+    _ensure_timer()
+    return get_buffer().incr(_label(model), pk)
+
+
+def pending_views(instance):
+    return get_buffer().pending(_label(type(instance)), instance.pk)
+
+
+def _models():
+    for label in getattr(settings, 'VIEW_COUNT_MODELS', []):
+        yield apps.get_model(label)
+
+
+def flush():
+    """Write buffered increments back to the database. Returns rows updated."""
+    buffer = get_buffer()
+    updated = 0
+    for model in _models():
+        label = _label(model)
+        counts = buffer.drain(label)
+        if not counts:
+            continue
+        by_increment = defaultdict(list)
+        for pk, value in counts.items():
+            by_increment[value].append(pk)
+        try:
+            with transaction.atomic():
+                for value, pks in by_increment.items():
+                    updated += model._default_manager.filter(pk__in=pks).update(**{FIELD: F(FIELD) + value})
+        except Exception:
+            buffer.restore(label, counts)
+            raise
+        flushed.send(sender=model, pks=list(counts))
+    return updated
+
+
+def _run_timer():
+    global _timer
+    try:
+        flush()
+    except Exception:
+        logger.exception("View count flush failed")
+    finally:
+        connections.close_all()
+        with _buffer_lock:
+            _timer = None
+        _ensure_timer()
+
+
+def _ensure_timer():
+    global _timer
+    interval = getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 30)
+    if not interval or _timer is not None:
+        return
+    with _buffer_lock:
+        if _timer is None:
+            _timer = threading.Timer(interval, _run_timer)
+            _timer.daemon = True
+            _timer.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer is not None:
+        try:
+            flush()
+        except Exception:
+            logger.exception("View count flush at exit failed")
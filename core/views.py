@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
+from django_ckeditor_5.forms import UploadFileForm
+from django_ckeditor_5.permissions import check_upload_permission
+from django_ckeditor_5.storage_utils import get_django_storage_class
+
+from .uploads import StreamingUploadHandler
+
+
+@csrf_exempt
+@require_POST
+@check_upload_permission
+def ckeditor_upload(request):
+    """
+    Drop-in for django_ckeditor_5's upload view. The permission check runs
+    before the body is read, then the image is streamed into the CKEditor
+    storage as it arrives instead of being buffered first.
+    """
+    storage = get_django_storage_class()()
+    if hasattr(storage, 'open_upload'):
+        request.upload_handlers = [StreamingUploadHandler(
+            request, storage, images_only=not getattr(settings, 'CKEDITOR_5_ALLOW_ALL_FILE_TYPES', False),
+        )]
+    return _ckeditor_upload(request, storage)
+
+
+@csrf_protect
+def _ckeditor_upload(request, storage):
+    form = UploadFileForm(request.POST, request.FILES)
+    handler = request.upload_handlers[0]
+    if getattr(handler, 'rejection', None):
+        status, message = handler.rejection
+        return JsonResponse({'error': {'message': message}}, status=status)
+    if form.is_valid():
+        upload = form.cleaned_data['upload']
+        name = storage.save(upload.name, upload)
+        return JsonResponse({'url': storage.url(name)})
+    errors = form.errors.get('upload')
+    return JsonResponse({'error': {'message': errors[0] if errors else "Invalid form data"}}, status=400)
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import OutboundEmail
+from .outbox import schedule_flush
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['batch', 'claimed_at', 'last_error', 'created_at', 'sent_at']
+    # Bodies can carry personal data and links meant for the recipient only
+    exclude = ['body', 'html_body']
+    actions = ['requeue']
+
+    @admin.action(description="Send selected messages again")
+    def requeue(self, request, queryset):
+        updated = queryset.filter(status=OutboundEmail.FAILED).update(status=OutboundEmail.QUEUED, attempts=0, last_error='')
+        if updated:
+            schedule_flush()
+        self.message_user(request, f"{updated} message(s) queued again.")
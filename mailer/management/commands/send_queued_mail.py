@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from mailer.models import OutboundEmail
+from mailer.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued mail now, batch by batch, until the outbox is empty or the rate cap is reached."
+
+    def handle(self, *args, **options):
+        total = 0
+        while sent := send_batch():
+            total += sent
+            self.stderr.write(f"{total} message(s) sent...")
+        queued = OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).count()
+        self.stdout.write(self.style.SUCCESS(f"{total} message(s) sent, {queued} still queued."))
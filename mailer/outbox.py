@@ -0,0 +1,146 @@
+"""
+Outbound mail, sent in batches over one connection.
+
+``queue_mail()`` stores the message and schedules the ``send_queued_mail``
+task (see ``tasks.queue``); the request never talks to the mail server. The
+task claims up to ``MAIL_BATCH_SIZE`` queued messages, sends them all over a
+single ``get_connection()`` session and schedules itself again while mail is
+left. Once ``MAIL_RATE_LIMIT`` messages went out within a minute it waits
+for the oldest to leave the window.
+
+Any Django email backend works, so tests run against locmem.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import enqueue
+from .models import OutboundEmail
+
+logger = logging.getLogger('backend')
+
+FLUSH_TASK = 'mailer.send_queued_mail'
+RATE_WINDOW = timedelta(minutes=1)
+SENT_RETENTION = timedelta(days=1)
+
+
+def queue_mail(subject, body, recipients, from_email=None, html_body=''):
+    message = OutboundEmail.objects.create(
+        subject=subject, body=body, html_body=html_body, from_email=from_email or '', to=list(recipients),
+    )
+    schedule_flush()
+    return message
+
+
+def queue_mass_mail(messages, from_email=None):
+    """Queue ``(subject, body, recipients)`` tuples with bulk inserts; returns how many."""
+    created = OutboundEmail.objects.bulk_create(
+        [OutboundEmail(subject=subject, body=body, from_email=from_email or '', to=list(recipients))
+         for subject, body, recipients in messages],
+        batch_size=500,
+    )
+    if created:
+        schedule_flush()
+    return len(created)
+
+
+def schedule_flush(countdown=0):
+    # One pending flush is enough; a running flush schedules the next itself
+    if not Task.objects.filter(name=FLUSH_TASK, status=Task.PENDING).exists():
+        enqueue(FLUSH_TASK, countdown=countdown)
+
+
+def recently_sent(now):
+    return OutboundEmail.objects.filter(status=OutboundEmail.SENT, sent_at__gt=now - RATE_WINDOW)
+
+
+def quota(now):
+    """Messages that may still go out in this minute, or None without a cap."""
+    if not settings.MAIL_RATE_LIMIT:
+        return None
+    return max(settings.MAIL_RATE_LIMIT - recently_sent(now).count(), 0)
+
+
+def seconds_until_quota(now):
+    oldest = recently_sent(now).order_by('sent_at').values_list('sent_at', flat=True).first()
+    return max((oldest + RATE_WINDOW - now).total_seconds(), 0) if oldest else 0
+
+
+def claim(limit, now):
+    # Messages stuck in 'sending' belong to a worker that died mid-batch
+    OutboundEmail.objects.filter(
+        status=OutboundEmail.SENDING, claimed_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT),
+    ).update(status=OutboundEmail.QUEUED, batch='', claimed_at=None)
+    due = list(OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).order_by('id').values_list('id', flat=True)[:limit])
+    if not due:
+        return []
+    batch = uuid.uuid4().hex
+    OutboundEmail.objects.filter(id__in=due, status=OutboundEmail.QUEUED).update(
+        status=OutboundEmail.SENDING, batch=batch, claimed_at=now,
+    )
+    return list(OutboundEmail.objects.filter(batch=batch, status=OutboundEmail.SENDING).order_by('id'))
+
+
+def build(message):
+    email = EmailMultiAlternatives(message.subject, message.body, message.from_email or None, message.to)
+    if message.html_body:
+        email.attach_alternative(message.html_body, 'text/html')
+    return email
+
+
+def failed(message, error):
+    message.attempts += 1
+    message.status = OutboundEmail.FAILED if message.attempts >= settings.MAIL_MAX_ATTEMPTS else OutboundEmail.QUEUED
+    logger.warning("Could not send mail #%s to %s (attempt %d): %s", message.pk, message.to, message.attempts, error)
+    OutboundEmail.objects.filter(pk=message.pk).update(
+        status=message.status, attempts=message.attempts, last_error=str(error), batch='', claimed_at=None,
+    )
+
+
+def send_batch(connection=None):
+    """
+    Send one batch over a single connection; returns how many went out. If
+    the connection cannot be opened the batch is queued again and the error
+    raised, so the flush task backs off.
+    """
+    now = timezone.now()
+    limit = settings.MAIL_BATCH_SIZE
+    remaining = quota(now)
+    if remaining is not None:
+        limit = min(limit, remaining)
+    messages = claim(limit, now) if limit > 0 else []
+    if not messages:
+        return 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception:
+        OutboundEmail.objects.filter(pk__in=[m.pk for m in messages]).update(
+            status=OutboundEmail.QUEUED, batch='', claimed_at=None,
+        )
+        raise
+    sent = []
+    try:
+        for message in messages:
+            # The connection is already open, so send_messages() reuses it
+            try:
+                connection.send_messages([build(message)])
+            except Exception as exc:
+                failed(message, exc)
+            else:
+                sent.append(message.pk)
+    finally:
+        connection.close()
+    OutboundEmail.objects.filter(pk__in=sent).update(status=OutboundEmail.SENT, sent_at=timezone.now(), batch='')
+    logger.info("Sent %d of %d queued message(s) over one connection", len(sent), len(messages))
+    return len(sent)
+
+
+def prune(now):
+    return OutboundEmail.objects.filter(status=OutboundEmail.SENT, sent_at__lt=now - SENT_RETENTION).delete()[0]
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.utils import timezone
+
+from tasks.queue import task
+from .models import OutboundEmail
+from .outbox import FLUSH_TASK, prune, quota, schedule_flush, seconds_until_quota, send_batch
+
+
+@task(name=FLUSH_TASK)
+def send_queued_mail():
+    sent = send_batch()
+    now = timezone.now()
+    if OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).exists():
+        if quota(now) == 0:
+            countdown = seconds_until_quota(now)
+        else:
+            # Nothing sent means every message failed; give the server a moment
+            countdown = 0 if sent else settings.TASK_RETRY_BACKOFF
+        schedule_flush(countdown)
+    prune(now)
@@ -0,0 +1,139 @@
+import socketserver
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from tasks.worker import Worker
+from .models import OutboundEmail
+from .outbox import FLUSH_TASK, queue_mail, queue_mass_mail, send_batch
+
+User = get_user_model()
+
+
+class CountingBackend(locmem.EmailBackend):
+    """locmem backend that counts connections and refuses one address."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any('bounce@example.com' in message.to for message in messages):
+            raise ConnectionError("Recipient refused")
+        return super().send_messages(messages)
+
+
+class SMTPStub(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail; counts sessions and messages."""
+
+    def handle(self):
+        self.server.sessions += 1
+        self.wfile.write(b'220 stub\r\n')
+        while line := self.rfile.readline():
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.wfile.write(b'354 go ahead\r\n')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.messages += 1
+                self.wfile.write(b'250 queued\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 ok\r\n')
+
+
+@override_settings(EMAIL_BACKEND='mailer.tests.CountingBackend', MAIL_BATCH_SIZE=2, MAIL_RATE_LIMIT=0, MAIL_MAX_ATTEMPTS=2)
+class OutboxTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_mail_goes_out_in_batches_over_one_connection(self):
+        queue_mass_mail([(f'Digest {i}', 'New jobs', [f'user{i}@example.com']) for i in range(5)])
+        self.assertEqual(Task.objects.filter(name=FLUSH_TASK).count(), 1)
+        self.assertEqual(mail.outbox, [])
+
+        Worker().drain()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 3)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(), 5)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(MAIL_RATE_LIMIT=3, MAIL_BATCH_SIZE=10)
+    def test_rate_cap_defers_the_rest_of_the_minute(self):
+        queue_mass_mail([('Digest', 'New jobs', [f'user{i}@example.com']) for i in range(5)])
+        Worker().drain()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).count(), 2)
+        flush = Task.objects.get(name=FLUSH_TASK)
+        self.assertGreater((flush.run_at - timezone.now()).total_seconds(), 50)
+
+    def test_refused_messages_are_retried_then_failed(self):
+        queue_mail('Hi', 'Body', ['bounce@example.com'])
+        queue_mail('Hi', 'Body', ['reader@example.com'])
+        with self.assertLogs('backend', 'WARNING'):
+            self.assertEqual(send_batch(), 1)
+            self.assertEqual(send_batch(), 0)
+
+        bounced = OutboundEmail.objects.get(to=['bounce@example.com'])
+        self.assertEqual((bounced.status, bounced.attempts), (OutboundEmail.FAILED, 2))
+        self.assertIn('Recipient refused', bounced.last_error)
+
+    def test_smtp_session_is_reused_for_the_batch(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPStub)
+        server.daemon_threads = True
+        server.sessions = server.messages = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        for i in range(3):
+            queue_mail(f'Hi {i}', 'Body', [f'user{i}@example.com'], from_email='no-reply@example.com')
+        smtp = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': '127.0.0.1', 'EMAIL_PORT': server.server_address[1],
+            'EMAIL_USE_TLS': False, 'EMAIL_HOST_USER': None, 'EMAIL_HOST_PASSWORD': None,
+            'MAIL_BATCH_SIZE': 10,
+        }
+        with self.settings(**smtp):
+            self.assertEqual(send_batch(), 3)
+        self.assertEqual((server.sessions, server.messages), (1, 3))
+
+
+@override_settings(CONTACT_NOTIFICATION_EMAILS=['team@example.com'])
+class QueuedMailTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_password_reset_mail_is_sent_by_the_worker(self):
+        User.objects.create_user('reader', 'reader@example.com', 'pass1234!')
+        response = self.client.post(reverse('request-password-reset'), {'email': 'reader@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+
+        Worker().drain()
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
+        self.assertIn('/reset-password/', mail.outbox[0].body)
+        # The link is a bearer token; it is built by the worker and never stored
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_contact_submission_notifies_the_team(self):
+        response = self.client.post(reverse('contact-create'), {
+            'name': 'Asha', 'email': 'asha@example.com', 'message': 'Need a website', 'project_type': 'website',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mail.outbox, [])
+
+        Worker().drain()
+        self.assertEqual(mail.outbox[0].to, ['team@example.com'])
+        self.assertIn('Website Development', mail.outbox[0].body)
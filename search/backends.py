@@ -0,0 +1,131 @@
+"""
+Ranked full-text queries over ``SearchDocument``.
+
+``search()`` picks the implementation for the default connection: MySQL
+FULLTEXT (``MATCH ... AGAINST`` in boolean mode) in production, SQLite FTS5
+(``bm25``) locally and in tests, and a plain ``icontains`` scan anywhere
+else. Every backend returns the same dicts, with ``snippet`` already
+HTML-escaped and matches wrapped in ``<mark>``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import SearchDocument
+
+TITLE_WEIGHT = 10.0
+MAX_TERMS = 8
+SNIPPET_WORDS = 24
+SNIPPET_CHARS = 200
+# Private-use markers, swapped for <mark> after escaping the snippet
+MARK_START, MARK_END = '\x02', '\x03'
+
+TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def parse_terms(query):
+    """
+    Words of ``query`` with all operator syntax dropped, so user input can
+    never form an FTS5 or boolean-mode expression of its own.
+    """
+    return TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def _mark(text):
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def highlight(text, terms, width=SNIPPET_CHARS):
+    """Escaped window of ``text`` around the first match, matches marked."""
+    pattern = re.compile(r'\b(%s)\w*' % '|'.join(map(re.escape, terms)), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(match.start() - width // 4, 0) if match else 0
+    excerpt = text[start:start + width]
+    marked = pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', excerpt)
+    prefix = '…' if start else ''
+    suffix = '…' if start + width < len(text) else ''
+    return prefix + _mark(marked) + suffix
+
+
+def _filters(kinds, alias=''):
+    # Draft posts are indexed too, but never returned
+    clauses, params = [f'{alias}is_public = %s'], [True]
+    if kinds:
+        clauses.append(f'{alias}kind IN ({", ".join(["%s"] * len(kinds))})')
+        params.extend(kinds)
+    return clauses, params
+
+
+def _sqlite(terms, kinds, limit):
+    # Every term is quoted; the last one also matches as a prefix
+    match = ' '.join(f'"{term}"' for term in terms) + '*'
+    clauses, params = _filters(kinds, alias='d.')
+    where = ''.join(f' AND {clause}' for clause in clauses)
+    sql = (
+        "SELECT d.kind, d.slug, d.title, "
+        f"snippet(search_searchdocument_fts, 1, %s, %s, '…', {SNIPPET_WORDS}), "
+        "bm25(search_searchdocument_fts, %s, 1.0) AS rank "
+        "FROM search_searchdocument_fts "
+        "JOIN search_searchdocument d ON d.id = search_searchdocument_fts.rowid "
+        f"WHERE search_searchdocument_fts MATCH %s{where} "
+        "ORDER BY rank LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MARK_START, MARK_END, TITLE_WEIGHT, match, *params, limit])
+        rows = cursor.fetchall()
+    # bm25() is lower-is-better; flip it so every backend ranks descending
+    return [
+        {'type': kind, 'slug': slug, 'title': title, 'snippet': _mark(snippet), 'score': -rank}
+        for kind, slug, title, snippet, rank in rows
+    ]
+
+
+def _mysql(terms, kinds, limit):
+    against = ' '.join(f'+{term}' for term in terms) + '*'
+    clauses, params = _filters(kinds)
+    where = ''.join(f' AND {clause}' for clause in clauses)
+    sql = (
+        "SELECT kind, slug, title, body, "
+        "MATCH(title) AGAINST (%s IN BOOLEAN MODE) * %s "
+        "+ MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AS score "
+        "FROM search_searchdocument "
+        f"WHERE MATCH(title, body) AGAINST (%s IN BOOLEAN MODE){where} "
+        "ORDER BY score DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [against, TITLE_WEIGHT, against, against, *params, limit])
+        rows = cursor.fetchall()
+    return [
+        {'type': kind, 'slug': slug, 'title': title, 'snippet': highlight(body, terms), 'score': score}
+        for kind, slug, title, body, score in rows
+    ]
+
+
+def _fallback(terms, kinds, limit):
+    docs = SearchDocument.objects.filter(is_public=True)
+    if kinds:
+        docs = docs.filter(kind__in=kinds)
+    for term in terms:
+        docs = docs.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    results = []
+    for doc in docs.order_by('-updated_at')[:limit]:
+        title = doc.title.lower()
+        score = sum(TITLE_WEIGHT if term in title else 1.0 for term in terms)
+        results.append({
+            'type': doc.kind, 'slug': doc.slug, 'title': doc.title,
+            'snippet': highlight(doc.body, terms), 'score': score,
+        })
+    return sorted(results, key=lambda result: -result['score'])
+
+
+BACKENDS = {'sqlite': _sqlite, 'mysql': _mysql}
+
+
+def search(query, kinds=None, limit=20):
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    backend = BACKENDS.get(connection.vendor, _fallback)
+    return backend(terms, kinds, limit)
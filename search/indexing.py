@@ -0,0 +1,112 @@
+"""
+Keeps ``SearchDocument`` rows in step with the searchable models.
+
+Each source model maps to a ``Source`` describing how to turn an instance into
+a title and a plain-text body. ``index()`` / ``unindex()`` are called from the
+save/delete receivers in ``search.signals``, ``index_many()`` after bulk
+imports; ``rebuild()`` backs the ``rebuild_search_index`` command.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from django.db import transaction
+
+from blogs.models import BlogPost
+from core.content import html_to_text
+from tutorials.models import Problems, Topic
+from .models import SearchDocument
+
+
+def join(*parts):
+    return ' '.join(part.strip() for part in parts if part and part.strip())
+
+
+@dataclass(frozen=True)
+class Source:
+    kind: str
+    model: type
+    title: Callable
+    body: Callable
+    is_public: Callable = lambda obj: True
+
+
+SOURCES = (
+    Source(
+        'blogpost', BlogPost,
+        title=lambda post: post.title,
+        body=lambda post: join(html_to_text(post.excerpt), post.plain_text),
+        is_public=lambda post: post.status == 'published',
+    ),
+    Source(
+        'topic', Topic,
+        title=lambda topic: topic.title,
+        body=lambda topic: topic.plain_text,
+    ),
+    Source(
+        'problem', Problems,
+        title=lambda problem: problem.title or '',
+        body=lambda problem: join(html_to_text(problem.question), problem.code_snippet),
+    ),
+)
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES}
+SOURCES_BY_KIND = {source.kind: source for source in SOURCES}
+
+
+def document_for(source, obj):
+    max_title = SearchDocument._meta.get_field('title').max_length
+    return SearchDocument(
+        kind=source.kind,
+        object_id=obj.pk,
+        slug=obj.slug,
+        title=source.title(obj)[:max_title],
+        body=source.body(obj),
+        is_public=source.is_public(obj),
+    )
+
+
+def index(obj):
+    source = SOURCES_BY_MODEL[type(obj)]
+    doc = document_for(source, obj)
+    SearchDocument.objects.update_or_create(
+        kind=doc.kind, object_id=doc.object_id,
+        defaults={'slug': doc.slug, 'title': doc.title, 'body': doc.body, 'is_public': doc.is_public},
+    )
+
+
+def index_many(objects):
+    """Replace the documents of ``objects`` (all of one model) in two statements."""
+    if not objects:
+        return
+    source = SOURCES_BY_MODEL[type(objects[0])]
+    with transaction.atomic():
+        SearchDocument.objects.filter(kind=source.kind, object_id__in=[obj.pk for obj in objects]).delete()
+        SearchDocument.objects.bulk_create([document_for(source, obj) for obj in objects])
+
+
+def unindex(obj):
+    source = SOURCES_BY_MODEL[type(obj)]
+    SearchDocument.objects.filter(kind=source.kind, object_id=obj.pk).delete()
+
+
+@transaction.atomic
+def rebuild(batch_size=500, progress=None):
+    """
+    Re-create every document from scratch, one ``bulk_create`` per batch, in
+    a single transaction so searches never see a half-built index. Row-level
+    inserts keep the SQLite FTS triggers and MySQL FULLTEXT indexes current.
+    """
+    SearchDocument.objects.all().delete()
+    counts = {}
+    for source in SOURCES:
+        batch, counts[source.kind] = [], 0
+        for obj in source.model.objects.order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(document_for(source, obj))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                counts[source.kind] += len(batch)
+                batch = []
+                if progress:
+                    progress(source.kind, counts[source.kind])
+        SearchDocument.objects.bulk_create(batch)
+        counts[source.kind] += len(batch)
+    return counts
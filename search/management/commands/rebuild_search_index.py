@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from search.indexing import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from blog posts, topics and problems."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        def progress(kind, done):
+            self.stdout.write(f"{kind}: {done} indexed...")
+
+        counts = rebuild(batch_size=options['batch_size'], progress=progress)
+        summary = ', '.join(f"{count} {kind}(s)" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {summary}."))
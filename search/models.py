@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized, plain-text copy of a searchable object. The full-text index
+    over (title, body) is created in the migrations: FULLTEXT on MySQL, an
+    FTS5 external-content table kept in sync by triggers on SQLite.
+    """
+    KIND_CHOICES = [
+        ('blogpost', 'Blog post'),
+        ('topic', 'Topic'),
+        ('problem', 'Problem'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    slug = models.SlugField(max_length=200)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    is_public = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blogs.models import BlogPost
+from tutorials.content_io import imported
+from tutorials.models import Problems, Topic
+from .indexing import SOURCES_BY_MODEL, index, index_many, unindex
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=Problems)
+def index_document(sender, instance, raw=False, **kwargs):
+    # Fixture loads go through rebuild_search_index instead
+    if not raw:
+        index(instance)
+
+
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Problems)
+def unindex_document(sender, instance, **kwargs):
+    unindex(instance)
+
+
+@receiver(imported)
+def index_imported(sender, objects, **kwargs):
+    if sender in SOURCES_BY_MODEL:
+        index_many(objects)
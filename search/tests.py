@@ -0,0 +1,90 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from blogs.models import BlogPost
+from tutorials.content_io import Importer
+from tutorials.models import Problems, Topic, Tutorial
+from .backends import parse_terms, search
+from .models import SearchDocument
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pass1234!')
+        self.client = APIClient()
+        self.url = reverse('search')
+        self.post = BlogPost.objects.create(
+            title='Asyncio in Django views', slug='async-django', excerpt='Going async',
+            content='<p>Use <strong>asyncio</strong> &amp; ASGI servers.</p>',
+            author=self.user, status='published', read_time=3,
+        )
+        self.draft = BlogPost.objects.create(
+            title='Draft about asyncio', slug='draft', excerpt='-', content='<p>asyncio</p>',
+            author=self.user, status='draft', read_time=1,
+        )
+        tutorial = Tutorial.objects.create(title='Python')
+        self.topic = Topic.objects.create(tutorial=tutorial, title='Generators', content='<p>yield from asyncio loops</p>')
+        self.problem = Problems.objects.create(
+            topic=self.topic, title='Reverse a list', question='Reverse it', code_snippet='items[::-1]',
+        )
+
+    def test_documents_follow_saves_and_deletes(self):
+        doc = SearchDocument.objects.get(kind='blogpost', object_id=self.post.pk)
+        self.assertEqual(doc.body, 'Going async Use asyncio & ASGI servers.')
+
+        self.post.title = 'Sync views'
+        self.post.save()
+        self.assertEqual(search('sync')[0]['title'], 'Sync views')
+
+        self.post.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='blogpost', object_id=self.post.pk).exists())
+        self.assertEqual(search('asgi'), [])
+
+    def test_ranks_title_matches_first_and_highlights(self):
+        self.client.force_authenticate(self.user)
+        results = self.client.get(self.url, {'q': 'asyncio'}).data['results']
+
+        self.assertEqual([r['slug'] for r in results], [self.post.slug, self.topic.slug])
+        self.assertIn('<mark>asyncio</mark>', results[0]['snippet'])
+        self.assertIn('&amp;', results[0]['snippet'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+        results = self.client.get(self.url, {'q': 'revers'}).data['results']
+        self.assertEqual([r['type'] for r in results], ['problem'])
+
+    def test_anonymous_users_do_not_see_topics(self):
+        results = self.client.get(self.url, {'q': 'asyncio'}).data['results']
+        self.assertEqual([r['type'] for r in results], ['blogpost'])
+        self.assertEqual(self.client.get(self.url, {'q': 'asyncio', 'type': 'topic'}).data['results'], [])
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_query_syntax_is_neutralised(self):
+        self.assertEqual(parse_terms('"asyncio" OR title:* -(x'), ['asyncio', 'or', 'title', 'x'])
+        self.assertEqual(search('NEAR(" *'), [])
+
+    def test_rebuild_recreates_index(self):
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(SearchDocument.objects.count(), 4)
+        self.assertEqual(search('items')[0]['slug'], self.problem.slug)
+
+    def test_imported_rows_are_indexed(self):
+        lines = [json.dumps(record) for record in [
+            {'type': 'topic', 'slug': self.topic.slug, 'tutorial': 'python', 'title': 'Coroutines',
+             'content': '<p>await everything</p>', 'video_url': None},
+            {'type': 'problem', 'slug': 'flatten', 'topic': self.topic.slug, 'title': 'Flatten a tree',
+             'question': 'Recursively', 'code_snippet': None, 'explanation': None, 'video_url': None},
+        ]]
+        Importer().run(lines)
+
+        self.assertEqual([r['title'] for r in search('await')], ['Coroutines'])
+        self.assertEqual(search('yield'), [])
+        self.assertEqual([r['slug'] for r in search('flatten')], ['flatten'])
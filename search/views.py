@@ -0,0 +1,40 @@
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .backends import search
+from .models import SearchDocument
+
+KINDS = [kind for kind, _ in SearchDocument.KIND_CHOICES]
+# Topics (and their content) are only served to logged-in users
+PUBLIC_KINDS = ['blogpost', 'problem']
+
+
+class SearchView(APIView):
+    """
+    GET /api/search/?q=<terms>[&type=blogpost,topic,problem][&limit=n]
+
+    Ranked across blog posts, topics and problems, best match first.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        allowed = KINDS if request.user.is_authenticated else PUBLIC_KINDS
+        requested = request.query_params.get('type')
+        kinds = allowed if not requested else [kind for kind in requested.split(',') if kind in allowed]
+        if not kinds:
+            return Response({'query': query, 'results': []})
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        return Response({'query': query, 'results': search(query, kinds=kinds, limit=limit)})
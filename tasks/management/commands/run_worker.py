@@ -0,0 +1,29 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks on a thread pool until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=settings.TASK_WORKER_THREADS, help="Tasks run concurrently.")
+        parser.add_argument('--once', action='store_true', help="Exit once no task is due instead of polling.")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        # Finish the tasks in flight on SIGTERM/SIGINT; unstarted ones stay queued
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+
+        worker = Worker()
+        threads = options['threads']
+        self.stdout.write(f"Worker {worker.name} running {threads} thread(s).")
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='task') as executor:
+            worker.run(executor, threads, stop, until_idle=options['once'])
+        self.stdout.write(self.style.SUCCESS("Worker stopped."))
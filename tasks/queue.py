@@ -0,0 +1,66 @@
+"""
+Durable background tasks stored in the database.
+
+    @task(max_attempts=3)
+    def send_password_reset_email(user_id):
+        ...
+
+    send_password_reset_email.delay(user.pk)
+
+``delay()`` inserts a ``Task`` row in the caller's transaction, so a task is
+never lost and never runs for a write that was rolled back. ``manage.py
+run_worker`` claims due rows and runs them on a thread pool (see
+``tasks.worker``). A failing task is retried with exponential backoff and
+marked ``dead`` after ``max_attempts``.
+
+Arguments are stored as JSON: pass primary keys, not model instances.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` under ``name`` (default ``<module>.<function>``)."""
+    def register(func):
+        task_function = TaskFunction(func, name or f'{func.__module__}.{func.__name__}', max_attempts)
+        registry[task_function.name] = task_function
+        return task_function
+    return register(func) if func is not None else register
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=None, countdown=0):
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: doubles per failure, capped, with jitter."""
+    delay = min(settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+    # Jitter keeps tasks that failed together (e.g. SMTP down) from retrying in lockstep
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+from .worker import Worker
+
+calls = []
+
+
+@task(name='tests.flaky', max_attempts=2)
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise ConnectionError("SMTP unavailable")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(name='test')
+
+    def test_failed_tasks_back_off_then_go_dead(self):
+        flaky.delay(5)
+        with self.assertLogs('backend', 'WARNING'):
+            self.assertEqual(self.worker.drain(), 1)
+
+        queued = Task.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (Task.PENDING, 1))
+        self.assertIn('SMTP unavailable', queued.last_error)
+        self.assertGreaterEqual(queued.run_at, timezone.now() + timedelta(seconds=29))
+        self.assertEqual(self.worker.drain(), 0)  # Not due yet
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('backend', 'ERROR'):
+            self.worker.drain()
+        self.assertEqual(Task.objects.get().status, Task.DEAD)
+        self.assertEqual(len(calls), 2)
+
+    def test_successful_tasks_are_removed(self):
+        flaky.delay(1)
+        with self.assertLogs('backend', 'WARNING'):
+            self.worker.drain()
+        Task.objects.update(run_at=timezone.now())
+        self.worker.drain()
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_abandoned_tasks_are_claimed_again(self):
+        flaky.delay(0)
+        Task.objects.update(status=Task.RUNNING, locked_by='gone', locked_at=timezone.now() - timedelta(minutes=5))
+        with self.assertLogs('backend', 'WARNING'):
+            self.assertEqual(self.worker.drain(), 1)
+        self.assertFalse(Task.objects.exists())
+
+    def test_claimed_tasks_are_not_claimed_twice(self):
+        flaky.delay(0)
+        self.assertEqual(len(self.worker.claim(10)), 1)
+        self.assertEqual(Worker(name='other').claim(10), [])
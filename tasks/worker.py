@@ -0,0 +1,106 @@
+import logging
+import os
+import socket
+import traceback
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import registry, retry_delay
+
+logger = logging.getLogger('backend')
+
+
+class Worker:
+    """
+    Claims due tasks and runs them. Claiming is a conditional UPDATE
+    (``status = 'pending'`` → ``'running'``), so any number of workers can
+    poll the same table without locking rows or running a task twice.
+    Tasks left ``running`` by a worker that died are put back after
+    ``TASK_LOCK_TIMEOUT``.
+    """
+
+    def __init__(self, name=None):
+        self.name = (name or f'{socket.gethostname()}:{os.getpid()}')[:100]
+
+    def requeue_stale(self, now):
+        stale = Q(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT))
+        # Attempts were counted when the task was claimed
+        dead = Task.objects.filter(stale, attempts__gte=F('max_attempts')).update(
+            status=Task.DEAD, last_error="Worker stopped while running the task.", locked_by='', locked_at=None,
+        )
+        requeued = Task.objects.filter(stale).update(status=Task.PENDING, locked_by='', locked_at=None)
+        if dead or requeued:
+            logger.warning("Recovered stale tasks: %d requeued, %d dead", requeued, dead)
+
+    def claim(self, limit):
+        """Mark up to ``limit`` due tasks as running by this worker and return them."""
+        now = timezone.now()
+        self.requeue_stale(now)
+        due = list(
+            Task.objects.filter(status=Task.PENDING, run_at__lte=now).values_list('pk', flat=True)[:limit]
+        )
+        if not due:
+            return []
+        # Another worker may claim some of these first; (locked_by, locked_at) tells ours apart
+        Task.objects.filter(pk__in=due, status=Task.PENDING).update(
+            status=Task.RUNNING, locked_by=self.name, locked_at=now, attempts=F('attempts') + 1,
+        )
+        return list(Task.objects.filter(status=Task.RUNNING, locked_by=self.name, locked_at=now))
+
+    def execute(self, task):
+        try:
+            function = registry.get(task.name)
+            if function is None:
+                raise LookupError(f"No task registered as {task.name!r}")
+            function(*task.args, **task.kwargs)
+        except Exception:
+            self.failed(task, traceback.format_exc())
+        else:
+            Task.objects.filter(pk=task.pk).delete()
+        finally:
+            # Worker threads keep their connection between tasks, within CONN_MAX_AGE
+            close_old_connections()
+
+    def failed(self, task, error):
+        update = {'last_error': error, 'locked_by': '', 'locked_at': None}
+        if task.attempts >= task.max_attempts:
+            update['status'] = Task.DEAD
+            logger.error("Task %s #%s failed %d time(s), giving up:\n%s", task.name, task.pk, task.attempts, error)
+        else:
+            update['status'] = Task.PENDING
+            update['run_at'] = timezone.now() + retry_delay(task.attempts)
+            logger.warning("Task %s #%s failed (attempt %d/%d), retrying at %s:\n%s",
+                           task.name, task.pk, task.attempts, task.max_attempts, update['run_at'], error)
+        Task.objects.filter(pk=task.pk).update(**update)
+
+    def drain(self):
+        """Run due tasks in this thread until none are left; returns how many ran."""
+        done = 0
+        while tasks := self.claim(settings.TASK_WORKER_THREADS):
+            for task in tasks:
+                self.execute(task)
+            done += len(tasks)
+        return done
+
+    def run(self, executor, threads, stop, until_idle=False):
+        """
+        Keep ``threads`` tasks running on ``executor``, claiming more as slots
+        free up, until ``stop`` is set (or, with ``until_idle``, nothing is due).
+        """
+        running = set()
+        while not stop.is_set():
+            if len(running) < threads:
+                running |= {executor.submit(self.execute, task) for task in self.claim(threads - len(running))}
+            if not running:
+                if until_idle:
+                    break
+                stop.wait(settings.TASK_POLL_INTERVAL)
+                continue
+            _, running = wait(running, timeout=settings.TASK_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        wait(running)
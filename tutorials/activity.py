@@ -0,0 +1,134 @@
+"""
+Buffered writer for the ``UserActivity`` feed.
+
+Views call ``record_activity(...)``, which only appends to an in-process
+buffer; events are stamped with the time they happened. A background timer
+(``ACTIVITY_FLUSH_INTERVAL`` seconds, 0 disables it) writes the buffer with
+``bulk_create`` in batches of ``ACTIVITY_BATCH_SIZE``, and a full batch wakes
+the writer early. Repeated views of one topic by one user inside a flush
+interval are recorded once.
+
+The buffer is per process and flushed at exit. Events still buffered when a
+process is killed, or in a batch the database rejects, are lost: acceptable
+for an activity feed, not for anything that must be durable.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import Comment, Topic, UserActivity
+
+logger = logging.getLogger('backend')
+
+_lock = threading.Lock()
+_events = []
+_views = set()
+_timer = None
+
+
+def record_activity(user_id, activity_type, topic_id=None, comment_id=None):
+    with _lock:
+        if activity_type == 'view':
+            if (user_id, topic_id) in _views:
+                return
+            _views.add((user_id, topic_id))
+        _events.append(UserActivity(
+            user_id=user_id, activity_type=activity_type, topic_id=topic_id, comment_id=comment_id,
+            created_at=timezone.now(),
+        ))
+        full = len(_events) >= settings.ACTIVITY_BATCH_SIZE
+    _ensure_timer(immediately=full)
+
+
+def pending():
+    with _lock:
+        return len(_events)
+
+
+def reset_buffer():
+    """Drop buffered events (tests)."""
+    with _lock:
+        _events.clear()
+        _views.clear()
+
+
+def flush():
+    """Write buffered events; returns how many rows were inserted."""
+    with _lock:
+        events = _events[:]
+        _events.clear()
+        _views.clear()
+    if not events:
+        return 0
+    try:
+        _write(events)
+    except IntegrityError:
+        # A topic, comment or user was deleted since the event; keep what still applies
+        _write(_without_dangling(events))
+    return len(events)
+
+
+def _write(events):
+    with transaction.atomic():
+        UserActivity.objects.bulk_create(events, batch_size=settings.ACTIVITY_BATCH_SIZE)
+
+
+def _without_dangling(events):
+    users = set(get_user_model().objects.filter(pk__in={e.user_id for e in events}).values_list('pk', flat=True))
+    topics = set(Topic.objects.filter(pk__in={e.topic_id for e in events if e.topic_id}).values_list('pk', flat=True))
+    comments = set(Comment.objects.filter(pk__in={e.comment_id for e in events if e.comment_id}).values_list('pk', flat=True))
+    kept = []
+    for event in events:
+        if event.user_id not in users:
+            continue
+        if event.topic_id not in topics:
+            event.topic_id = None
+        if event.comment_id not in comments:
+            event.comment_id = None
+        kept.append(event)
+    return kept
+
+
+def _run_timer():
+    global _timer
+    try:
+        flush()
+    except Exception:
+        logger.exception("Activity flush failed")
+    finally:
+        connections.close_all()
+        with _lock:
+            if _timer is threading.current_thread():
+                _timer = None
+            more = bool(_events)
+        if more:
+            _ensure_timer()
+
+
+def _ensure_timer(immediately=False):
+    global _timer
+    interval = getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 10)
+    if not interval:
+        return
+    with _lock:
+        if _timer is not None:
+            if not immediately or _timer.finished.is_set():
+                return
+            # Cut the wait short; a timer that is already writing just finishes
+            _timer.cancel()
+        _timer = threading.Timer(0 if immediately else interval, _run_timer)
+        _timer.daemon = True
+        _timer.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Activity flush at exit failed")
@@ -32,10 +32,10 @@ class TutorialAdmin(admin.ModelAdmin):
 # ======================
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
-    list_display = ('title', 'tutorial', 'views', 'created_at')
+    list_display = ('title', 'tutorial', 'views', 'like_count', 'dislike_count', 'created_at')
     search_fields = ('title', 'tutorial__title')
     list_filter = ('tutorial', 'created_at')
-    readonly_fields = ('views', 'created_at', 'updated_at')
+    readonly_fields = ('views', 'like_count', 'dislike_count', 'created_at', 'updated_at')
     prepopulated_fields = {'slug': ('title',)}  # Auto slug generation
     ordering = ('-created_at',)
     fieldsets = (
@@ -43,7 +43,7 @@ class TopicAdmin(admin.ModelAdmin):
             'fields': ('tutorial', 'title', 'slug', 'content', 'video_url')
         }),
         ('Statistics', {
-            'fields': ('views',),
+            'fields': ('views', 'like_count', 'dislike_count'),
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -0,0 +1,173 @@
+"""
+JSONL interchange format for ``export_content`` / ``import_content``.
+
+One object per line, tagged with ``type``; parents are referenced by slug and
+always precede their children in an export:
+
+    {"type": "tutorial", "slug": "python", "title": ..., ...}
+    {"type": "topic", "slug": "loops", "tutorial": "python", ...}
+    {"type": "problem", "slug": "sum-list", "topic": "loops", ...}
+"""
+import json
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from core.models import DerivedContent
+from core.slugs import allocate_slugs
+from .models import Tutorial, Topic, Problems
+
+
+@dataclass(frozen=True)
+class Kind:
+    name: str
+    model: type
+    fields: tuple
+    parent_field: str = None
+    parent_model: type = None
+
+
+KINDS = (
+    Kind('tutorial', Tutorial, ('title', 'description', 'thumbnail')),
+    Kind('topic', Topic, ('title', 'content', 'video_url'), 'tutorial', Tutorial),
+    Kind('problem', Problems, ('title', 'question', 'code_snippet', 'explanation', 'video_url'), 'topic', Topic),
+)
+KINDS_BY_NAME = {kind.name: kind for kind in KINDS}
+
+# Sent with sender=<model> and the created/updated objects of each batch, inside
+# its transaction: bulk_create/bulk_update send no post_save.
+imported = Signal()
+
+
+def export_rows(chunk_size=2000):
+    """Yield every row as a dict, streaming each table with a server-side iterator."""
+    for kind in KINDS:
+        columns = ['slug', *kind.fields]
+        if kind.parent_field:
+            columns.append(f'{kind.parent_field}__slug')
+        rows = kind.model.objects.order_by('pk').values(*columns)
+        for row in rows.iterator(chunk_size=chunk_size):
+            record = {'type': kind.name, 'slug': row['slug']}
+            record.update((field, row[field]) for field in kind.fields)
+            if kind.parent_field:
+                record[kind.parent_field] = row[f'{kind.parent_field}__slug']
+            yield kind, record
+
+
+class Importer:
+    """
+    Upsert rows by slug in batches: one lookup per batch for existing rows and
+    parents, then ``bulk_create`` for new rows and ``bulk_update`` for the rest.
+    Only the current batch is held in memory.
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.counts = {kind.name: {'created': 0, 'updated': 0, 'skipped': 0} for kind in KINDS}
+        self.started = time.monotonic()
+        self.seen = 0
+
+    def run(self, lines):
+        batch, kind = [], None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record_kind = KINDS_BY_NAME[record.pop('type')]
+            if batch and (record_kind is not kind or len(batch) >= self.batch_size):
+                self.flush(kind, batch)
+                batch = []
+            kind = record_kind
+            batch.append(record)
+        if batch:
+            self.flush(kind, batch)
+        return self.counts
+
+    def flush(self, kind, batch):
+        counts = self.counts[kind.name]
+        parents = {}
+        if kind.parent_field:
+            parent_slugs = {record[kind.parent_field] for record in batch}
+            parents = dict(kind.parent_model.objects.filter(slug__in=parent_slugs).values_list('slug', 'pk'))
+
+        objects = []
+        for record in batch:
+            values = self.values(kind, record)
+            if values is None:
+                counts['skipped'] += 1
+                continue
+            if kind.parent_field:
+                parent_pk = parents.get(record[kind.parent_field])
+                if parent_pk is None:
+                    counts['skipped'] += 1
+                    continue
+                values[f'{kind.parent_field}_id'] = parent_pk
+            obj = kind.model(slug=record.get('slug') or '', **values)
+            if isinstance(obj, DerivedContent):
+                obj.refresh_derived_content()
+            objects.append(obj)
+
+        # A slug repeated within the batch: the last occurrence wins
+        by_slug = {obj.slug: obj for obj in objects if obj.slug}
+        objects = [obj for obj in objects if not obj.slug] + list(by_slug.values())
+
+        with transaction.atomic():
+            existing = dict(kind.model.objects.filter(slug__in=by_slug).values_list('slug', 'pk'))
+            to_create, to_update = [], []
+            for obj in objects:
+                if obj.slug in existing:
+                    obj.pk = existing[obj.slug]
+                    to_update.append(obj)
+                else:
+                    to_create.append(obj)
+
+            allocate_slugs(to_create, 'title')
+            kind.model.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                now = timezone.now()
+                for obj in to_update:
+                    obj.updated_at = now
+                update_fields = [*kind.fields, 'updated_at']
+                if issubclass(kind.model, DerivedContent):
+                    update_fields.extend(kind.model.DERIVED_FIELDS)
+                if kind.parent_field:
+                    update_fields.append(kind.parent_field)
+                kind.model.objects.bulk_update(to_update, update_fields, batch_size=self.batch_size)
+
+            if any(obj.pk is None for obj in to_create):
+                # Backends that cannot return ids from bulk inserts (MySQL)
+                created = dict(kind.model.objects.filter(slug__in=[obj.slug for obj in to_create]).values_list('slug', 'pk'))
+                for obj in to_create:
+                    obj.pk = created[obj.slug]
+            imported.send(sender=kind.model, objects=to_create + to_update)
+
+        counts['created'] += len(to_create)
+        counts['updated'] += len(to_update)
+        self.seen += len(batch)
+        if self.progress:
+            self.progress(kind.name, self.seen, self.rate())
+
+    def values(self, kind, record):
+        """
+        Column values of ``record``. A missing or null value falls back to the
+        field's default; returns None if a required field has neither.
+        """
+        values = {}
+        for name in kind.fields:
+            field = kind.model._meta.get_field(name)
+            value = record.get(name)
+            if value is None and not field.null:
+                if not field.blank and not field.has_default():
+                    return None
+                value = field.get_default()
+            values[name] = value
+        return values
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.seen / elapsed if elapsed else 0.0
@@ -1,8 +1,14 @@
 from storages.backends.s3boto3 import S3Boto3Storage
 
-class CustomStorage(S3Boto3Storage):
+from core.storage import ContentAddressedMixin, StreamingS3Mixin
+
+class CustomStorage(ContentAddressedMixin, StreamingS3Mixin, S3Boto3Storage):
     """
     Custom S3 storage class, for example, to modify file name or set custom ACLs.
+
+    Content-addressed: editors re-uploading the same screenshot into CKEditor
+    get the existing object's URL back instead of a new copy (see core.storage).
+    Streams CKEditor uploads straight into S3 multipart uploads (core.uploads).
     """
     # You can override any method or property here if necessary
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,35 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from tutorials.content_io import export_rows
+
+
+class Command(BaseCommand):
+    help = "Stream tutorials, topics and problems as JSONL (parents before children)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help="File to write; defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--progress-every', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        out = open(options['output'], 'w', encoding='utf-8') if options['output'] else self.stdout
+        started = time.monotonic()
+        written = 0
+        try:
+            for kind, record in export_rows(chunk_size=options['chunk_size']):
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                written += 1
+                if written % options['progress_every'] == 0:
+                    self.report(kind.name, written, started)
+        finally:
+            if out is not self.stdout:
+                out.close()
+        self.report('done', written, started)
+
+    def report(self, label, written, started):
+        elapsed = time.monotonic() - started
+        rate = written / elapsed if elapsed else 0.0
+        self.stderr.write(f"{label}: {written} rows exported ({rate:,.0f} rows/s)")
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.cache import invalidate
+from tutorials.content_io import Importer
+
+
+class Command(BaseCommand):
+    help = "Upsert tutorials, topics and problems by slug from a JSONL export."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', help="JSONL file to read; defaults to stdin.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        importer = Importer(batch_size=options['batch_size'], progress=self.report)
+        if options['input']:
+            with open(options['input'], encoding='utf-8') as lines:
+                counts = importer.run(lines)
+        else:
+            counts = importer.run(sys.stdin)
+
+        # bulk_create/bulk_update send no model signals
+        invalidate('problems')
+
+        for kind, result in counts.items():
+            self.stdout.write(
+                f"{kind}: {result['created']} created, {result['updated']} updated, "
+                f"{result['skipped']} skipped (missing parent or required field)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{importer.seen} rows in {importer.rate():,.0f} rows/s"))
+
+    def report(self, kind, seen, rate):
+        self.stderr.write(f"{kind}: {seen} rows imported ({rate:,.0f} rows/s)")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from tutorials.models import Topic
+
+
+class Command(BaseCommand):
+    help = "Recompute Topic.like_count / dislike_count from TopicReaction rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        drifted = (
+            Topic.objects.with_reaction_totals()
+            .filter(~Q(like_count=F('num_likes')) | ~Q(dislike_count=F('num_dislikes')))
+            .only('id', 'like_count', 'dislike_count')
+            .order_by('id')
+        )
+
+        fixed = 0
+        batch = []
+        for topic in drifted.iterator(chunk_size=batch_size):
+            topic.like_count = topic.num_likes
+            topic.dislike_count = topic.num_dislikes
+            batch.append(topic)
+            if len(batch) >= batch_size:
+                fixed += self.flush(batch, options['dry_run'])
+                batch = []
+        fixed += self.flush(batch, options['dry_run'])
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{fixed} topic(s) {verb}."))
+
+    def flush(self, batch, dry_run):
+        if batch and not dry_run:
+            Topic.objects.bulk_update(batch, ['like_count', 'dislike_count'])
+        return len(batch)
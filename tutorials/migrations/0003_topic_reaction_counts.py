@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:13
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    Topic = apps.get_model('tutorials', 'Topic')
+    TopicReaction = apps.get_model('tutorials', 'TopicReaction')
+
+    def total(is_like):
+        counts = (
+            TopicReaction.objects.filter(topic=OuterRef('pk'), is_like=is_like)
+            .order_by()
+            .values('topic')
+            .annotate(c=Count('pk'))
+            .values('c')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Topic.objects.update(like_count=total(True), dislike_count=total(False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='dislike_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0003_topic_reaction_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['topic', '-created_at', '-id'], name='comment_topic_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='comment_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='problems',
+            index=models.Index(fields=['topic', '-created_at', '-id'], name='problem_topic_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='problems',
+            index=models.Index(fields=['-created_at', '-id'], name='problem_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(fields=['-created_at', '-id'], name='tutorial_created_idx'),
+        ),
+    ]
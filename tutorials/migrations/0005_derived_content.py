@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='plain_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='read_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Read time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='summary',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tutorial',
+            name='plain_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tutorial',
+            name='read_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Read time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='tutorial',
+            name='summary',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='tutorial',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0005_derived_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutorial',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
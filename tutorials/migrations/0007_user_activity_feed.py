@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0006_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useractivity',
+            name='topic',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tutorials.topic'),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='activity_type',
+            field=models.CharField(choices=[('comment', 'Commented'), ('like', 'Liked'), ('dislike', 'Disliked'), ('topic_like', 'Liked topic'), ('topic_dislike', 'Disliked topic'), ('view', 'Viewed topic')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+        ),
+    ]
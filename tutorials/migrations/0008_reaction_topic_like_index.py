@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0007_user_activity_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topicreaction',
+            index=models.Index(fields=['topic', 'is_like'], name='reaction_topic_like_idx'),
+        ),
+    ]
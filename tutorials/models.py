@@ -1,56 +1,132 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
-from django.utils.text import slugify
+from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
+from core.models import DerivedContent
+from core.slugs import save_with_unique_slug
 
 User = settings.AUTH_USER_MODEL
 
 
-class Tutorial(models.Model):
+class TutorialQuerySet(models.QuerySet):
+    def list_mode(self):
+        """Columns used by TutorialListSerializer; skips the description HTML and its plain text."""
+        return self.only('id', 'title', 'slug', 'summary', 'read_time', 'thumbnail', 'thumbnail_variants', 'created_at')
+
+    def with_topic_counts(self):
+        # A correlated count rather than Count('topics'): the GROUP BY would
+        # make the database sort the whole result instead of walking an index.
+        counts = (
+            Topic.objects.filter(tutorial=OuterRef('pk'))
+            .order_by()
+            .values('tutorial')
+            .annotate(c=Count('pk'))
+            .values('c')
+        )
+        return self.annotate(num_topics=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class TopicQuerySet(models.QuerySet):
+    def list_mode(self):
+        """Columns used by TopicTitleSerializer (plus the FK for prefetching)."""
+        return self.only('id', 'tutorial', 'title', 'slug', 'views', 'like_count', 'dislike_count')
+
+    def with_counts(self):
+        # Likes/dislikes are denormalized onto the row; only comments need counting.
+        return self.annotate(num_comments=Count('comments'))
+
+    def with_reaction_totals(self):
+        # Ground truth from TopicReaction, used to reconcile like_count/dislike_count.
+        return self.annotate(
+            num_likes=Count('reactions', filter=Q(reactions__is_like=True)),
+            num_dislikes=Count('reactions', filter=Q(reactions__is_like=False)),
+        )
+
+
+class CommentQuerySet(models.QuerySet):
+    def with_stats(self, user=None):
+        """
+        Like/dislike totals as correlated subqueries (joining both M2M tables
+        would multiply rows), plus the requesting user's own reaction. The
+        joined topic is only ever shown by title, so its text is deferred.
+        """
+        qs = self.select_related('user', 'topic').defer('topic__content', 'topic__plain_text').annotate(
+            num_likes=self._count(Comment.likes.through),
+            num_dislikes=self._count(Comment.dislikes.through),
+        )
+        if user is not None and user.is_authenticated:
+            qs = qs.annotate(my_reaction=Case(
+                When(Exists(Comment.likes.through.objects.filter(comment=OuterRef('pk'), user=user)), then=Value('like')),
+                When(Exists(Comment.dislikes.through.objects.filter(comment=OuterRef('pk'), user=user)), then=Value('dislike')),
+                default=None,
+                output_field=models.CharField(),
+            ))
+        return qs
+
+    @staticmethod
+    def _count(through):
+        counts = (
+            through.objects.filter(comment=OuterRef('pk'))
+            .order_by()
+            .values('comment')
+            .annotate(c=Count('pk'))
+            .values('c')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Tutorial(DerivedContent):
+    content_field = 'description'
+
     title = models.CharField(max_length=255)
     slug = models.SlugField(unique=True, blank=True)
     description = CKEditor5Field('Text', config_name='extends')
     thumbnail = models.ImageField(upload_to='tutorial_thumbnails/', blank=True, null=True)
+    # Resized WebP/AVIF copies of the thumbnail, maintained by core.images
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TutorialQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tutorial_created_idx'),
+        ]
+
     def total_topics(self):
         return self.topics.count()
 
     def save(self, *args, **kwargs):
         if not self.slug:  # Auto-generate only on create
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Tutorial.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            return save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 
-class Topic(models.Model):
+class Topic(DerivedContent):
+    content_field = 'content'
+
     tutorial = models.ForeignKey(Tutorial, related_name='topics', on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
     slug = models.SlugField(unique=True, blank=True)
     content = CKEditor5Field('Text', config_name='extends')
     video_url = models.URLField(blank=True, null=True)
     views = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    dislike_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TopicQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Topic.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            return save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -71,18 +147,18 @@ class Problems(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', '-created_at', '-id'], name='problem_topic_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='problem_created_idx'),
+        ]
+
     def __str__(self):
         return f"Problem in {self.topic.title}"
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Topic.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            return save_with_unique_slug(self, self.title, super().save, *args, **kwargs)
         super().save(*args, **kwargs)
 
 
@@ -96,6 +172,14 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', '-created_at', '-id'], name='comment_topic_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='comment_user_created_idx'),
+        ]
+
     def total_likes(self):
         return self.likes.count()
 
@@ -113,17 +197,76 @@ class TopicReaction(models.Model):
 
     class Meta:
         unique_together = ('topic', 'user')
+        indexes = [
+            # Covers the per-topic like/dislike counts
+            models.Index(fields=['topic', 'is_like'], name='reaction_topic_like_idx'),
+        ]
+
+    @classmethod
+    def react(cls, topic, user, is_like):
+        """
+        Set (True/False) or clear (None) a user's reaction and move the
+        denormalized counters on Topic in the same transaction.
+        """
+        with transaction.atomic():
+            reaction = cls.objects.select_for_update().filter(topic=topic, user=user).first()
+            if reaction is None and is_like is not None:
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(topic=topic, user=user, is_like=is_like)
+                except IntegrityError:
+                    # A concurrent request inserted it first; treat this as a flip.
+                    reaction = cls.objects.select_for_update().get(topic=topic, user=user)
+                else:
+                    cls._shift_counts(topic, None, is_like)
+                    return
+
+            previous = reaction.is_like if reaction else None
+            if previous == is_like:
+                return
+            if is_like is None:
+                reaction.delete()
+            else:
+                cls.objects.filter(pk=reaction.pk).update(is_like=is_like)
+            cls._shift_counts(topic, previous, is_like)
+
+    @staticmethod
+    def _shift_counts(topic, previous, current):
+        updates = {}
+        if previous is not None:
+            field = 'like_count' if previous else 'dislike_count'
+            # Greatest() keeps an unsigned column from underflowing if it ever drifted.
+            updates[field] = Greatest(F(field), 1) - 1
+        if current is not None:
+            field = 'like_count' if current else 'dislike_count'
+            updates[field] = F(field) + 1
+        # The counters are part of the topic, so they move Last-Modified too
+        Topic.objects.filter(pk=topic.pk).update(updated_at=timezone.now(), **updates)
 
 
 class UserActivity(models.Model):
+    """
+    Append-only activity feed. Rows are written in batches by
+    ``tutorials.activity``, so ``created_at`` is the time of the event, not
+    of the insert.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, null=True, blank=True, on_delete=models.SET_NULL)
     comment = models.ForeignKey(Comment, null=True, blank=True, on_delete=models.SET_NULL)
     activity_type = models.CharField(max_length=50, choices=[
         ('comment', 'Commented'),
         ('like', 'Liked'),
         ('dislike', 'Disliked'),
+        ('topic_like', 'Liked topic'),
+        ('topic_dislike', 'Disliked topic'),
+        ('view', 'Viewed topic'),
     ])
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.activity_type}"
@@ -1,10 +1,14 @@
 from rest_framework import serializers
-from .models import Tutorial, Topic, Comment, TopicReaction, Problems
+from core.fieldsets import SparseFieldsMixin
+from core.images import SrcsetField
+from .models import Tutorial, Topic, Comment, TopicReaction, Problems, UserActivity
 
 class CommentSerializer(serializers.ModelSerializer):
+    # Expects instances from Comment.objects.with_stats(user)
     user = serializers.StringRelatedField(read_only=True)
-    total_likes = serializers.IntegerField(read_only=True)
-    total_dislikes = serializers.IntegerField(read_only=True)
+    total_likes = serializers.IntegerField(source='num_likes', read_only=True)
+    total_dislikes = serializers.IntegerField(source='num_dislikes', read_only=True)
+    my_reaction = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
@@ -14,41 +18,46 @@ class CommentSerializer(serializers.ModelSerializer):
             'content',
             'total_likes',
             'total_dislikes',
+            'my_reaction',
             'created_at',
             'updated_at'
         ]
 
+    def get_my_reaction(self, obj):
+        return getattr(obj, 'my_reaction', None)
 
-class TopicSerializer(serializers.ModelSerializer):
-    comments = CommentSerializer(many=True, read_only=True)
+
+class TopicSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Newest comments page, supplied by TopicDetailView through context['comments']
+    comments = serializers.SerializerMethodField()
     reactions = serializers.SerializerMethodField()
 
     class Meta:
         model = Topic
         fields = ['id', 'tutorial', 'title', 'content', 'video_url', 'views', 'created_at', 'updated_at', 'comments', 'reactions']
+        sparse_columns = {'comments': (), 'reactions': ('like_count', 'dislike_count')}
 
-    def get_reactions(self, obj):
-        likes = obj.reactions.filter(is_like=True).count()
-        dislikes = obj.reactions.filter(is_like=False).count()
-        return {'likes': likes, 'dislikes': dislikes}
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'comments' not in self.context:
+            self.fields.pop('comments', None)
 
+    def get_comments(self, obj):
+        return self.context['comments']
+
+    def get_reactions(self, obj):
+        return {'likes': obj.like_count, 'dislikes': obj.dislike_count}
 
 
 class TopicTitleSerializer(serializers.ModelSerializer):
-    likes = serializers.SerializerMethodField()
-    dislikes = serializers.SerializerMethodField()
+    likes = serializers.IntegerField(source='like_count', read_only=True)
+    dislikes = serializers.IntegerField(source='dislike_count', read_only=True)
+    # Read from the TopicQuerySet.with_counts() annotation
+    comments_count = serializers.IntegerField(source='num_comments', read_only=True)
 
     class Meta:
         model = Topic
-        fields = ['id', 'title', 'slug', 'views', 'likes', 'dislikes']  # Replacing reactions with likes and dislikes
-
-    def get_likes(self, obj):
-        # Count the number of likes (assuming `is_like=True` represents a like)
-        return obj.reactions.filter(is_like=True).count()
-
-    def get_dislikes(self, obj):
-        # Count the number of dislikes (assuming `is_like=False` represents a dislike)
-        return obj.reactions.filter(is_like=False).count()
+        fields = ['id', 'title', 'slug', 'views', 'likes', 'dislikes', 'comments_count']  # Replacing reactions with likes and dislikes
 
 
 class TutorialSerializer(serializers.ModelSerializer):
@@ -74,26 +83,28 @@ class TutorialSerializer(serializers.ModelSerializer):
 
 class TutorialListSerializer(serializers.ModelSerializer):
     # topics = TopicTitleSerializer(many=True, read_only=True)
-    total_topics = serializers.SerializerMethodField()
+    # Expects Tutorial.objects.list_mode(); the description HTML is never loaded
+    total_topics = serializers.IntegerField(source='num_topics', read_only=True)
+    thumbnail_srcset = SrcsetField('thumbnail')
 
     class Meta:
         model = Tutorial
         fields = [
             'id',
             'title',
-            'description',
+            'summary',
+            'read_time',
             'thumbnail',
+            'thumbnail_srcset',
             'total_topics',
             'slug',
             'created_at',
         ]
 
-    def get_total_topics(self, obj):
-        return obj.topics.count()
-
-class TutorialDetailSerializer(serializers.ModelSerializer):
+class TutorialDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     topics = TopicTitleSerializer(many=True, read_only=True)
-    total_topics = serializers.SerializerMethodField()
+    total_topics = serializers.IntegerField(source='num_topics', read_only=True)
+    thumbnail_srcset = SrcsetField('thumbnail')
 
     class Meta:
         model = Tutorial
@@ -102,31 +113,38 @@ class TutorialDetailSerializer(serializers.ModelSerializer):
             'title',
             'description',
             'thumbnail',
+            'thumbnail_srcset',
             'created_at',
             'updated_at',
             'topics',
             'total_topics'
         ]
 
-    def get_total_topics(self, obj):
-        return obj.topics.count()
-
 class UserCommentSerializer(serializers.ModelSerializer):
     topic_title = serializers.CharField(source='topic.title', read_only=True)
-    total_likes = serializers.IntegerField(read_only=True)
-    total_dislikes = serializers.IntegerField(read_only=True)
+    total_likes = serializers.IntegerField(source='num_likes', read_only=True)
+    total_dislikes = serializers.IntegerField(source='num_dislikes', read_only=True)
 
     class Meta:
         model = Comment
         fields = ['id', 'topic_title', 'content', 'total_likes', 'total_dislikes', 'created_at']
 
+class UserActivitySerializer(serializers.ModelSerializer):
+    # Null once the topic is deleted
+    topic_title = serializers.CharField(source='topic.title', read_only=True, allow_null=True)
+    topic_slug = serializers.CharField(source='topic.slug', read_only=True, allow_null=True)
+
+    class Meta:
+        model = UserActivity
+        fields = ['id', 'activity_type', 'topic_title', 'topic_slug', 'comment', 'created_at']
+
 class ProblemListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Problems
         fields = ['title', 'slug']
 
 
-class ProblemDetailSerializer(serializers.ModelSerializer):
+class ProblemDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     topic = serializers.StringRelatedField()  # Shows topic title instead of ID
 
     class Meta:
@@ -143,6 +161,8 @@ class ProblemDetailSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+        # str(topic) is "<tutorial title> - <topic title>"
+        sparse_columns = {'topic': ('topic__title', 'topic__tutorial__title')}
 
 #Problem Serializer start here
 
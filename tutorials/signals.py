@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate
+from core.images import refresh_variants
+from .models import Problems, Topic, Tutorial
+
+
+@receiver(post_save, sender=Tutorial)
+def refresh_thumbnail_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_variants(instance, 'thumbnail')
+
+
+@receiver([post_save, post_delete], sender=Problems)
+@receiver([post_save, post_delete], sender=Topic)
+@receiver([post_save, post_delete], sender=Tutorial)
+def invalidate_problems(sender, **kwargs):
+    # Problem details render their topic (and its tutorial) by title
+    invalidate('problems')
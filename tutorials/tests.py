@@ -1,3 +1,383 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from core import view_counts
+from . import activity
+from .content_io import Importer
+from .models import Tutorial, Topic, Comment, TopicReaction, Problems, UserActivity
+
+User = get_user_model()
+
+
+class TutorialTestMixin:
+    def setUp(self):
+        # Activity is flushed by the tests themselves, never from a timer thread
+        overrides = self.settings(ACTIVITY_FLUSH_INTERVAL=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        activity.reset_buffer()
+        self.addCleanup(activity.reset_buffer)
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pass1234!')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tutorial = Tutorial.objects.create(title='Python', description='<p>Intro</p>')
+        self.voters = [
+            User.objects.create_user(f'voter{i}', f'voter{i}@example.com', 'pass1234!')
+            for i in range(2)
+        ]
+
+    def make_topics(self, count):
+        voters = self.voters
+        topics = []
+        for i in range(count):
+            topic = Topic.objects.create(tutorial=self.tutorial, title=f'Lesson {i}', content='<p>Body</p>')
+            TopicReaction.react(topic, voters[0], True)
+            TopicReaction.react(topic, voters[1], False)
+            Comment.objects.create(topic=topic, user=voters[0], content='Nice')
+            topics.append(topic)
+        return topics
+
+
+class TopicCountQueryTests(TutorialTestMixin, TestCase):
+    def test_topic_list_query_count_is_constant(self):
+        self.make_topics(3)
+        url = reverse('topic-list', kwargs={'tutorial_slug': self.tutorial.slug})
+        with self.assertNumQueries(1):
+            small = self.client.get(url)
+
+        self.make_topics(10)
+        with self.assertNumQueries(1):
+            large = self.client.get(url)
+
+        self.assertEqual(len(small.data), 3)
+        self.assertEqual(len(large.data), 13)
+        first = large.data[0]
+        self.assertEqual((first['likes'], first['dislikes'], first['comments_count']), (1, 1, 1))
+
+    def test_tutorial_detail_query_count_is_constant(self):
+        self.make_topics(12)
+        url = reverse('tutorial-detail', kwargs={'slug': self.tutorial.slug})
+        # validators, tutorial, prefetched topics
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.data['total_topics'], 12)
+        self.assertTrue(all(t['likes'] == 1 and t['dislikes'] == 1 for t in response.data['topics']))
+
+    def test_list_views_never_load_html_columns(self):
+        self.make_topics(2)
+        with CaptureQueriesContext(connection) as list_queries:
+            tutorials = self.client.get(reverse('tutorial-list')).data['results']
+        with CaptureQueriesContext(connection) as topic_queries:
+            self.client.get(reverse('topic-list', kwargs={'tutorial_slug': self.tutorial.slug}))
+            self.client.get(reverse('tutorial-detail', kwargs={'slug': self.tutorial.slug}))
+
+        self.assertFalse(any('"description"' in q['sql'] for q in list_queries.captured_queries))
+        self.assertFalse(any('"tutorials_topic"."content"' in q['sql'] for q in topic_queries.captured_queries))
+        self.assertEqual(tutorials[0]['summary'], 'Intro')
+        self.assertNotIn('description', tutorials[0])
+
+
+class TopicReactionCounterTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.topic = Topic.objects.create(tutorial=self.tutorial, title='Loops', content='<p>Body</p>')
+        self.url = reverse('topic-reaction', kwargs={'topic_slug': self.topic.slug})
+
+    def react(self, action):
+        response = self.client.post(self.url, {'action': action}, format='json')
+        return response.status_code, response.data
+
+    def test_like_flip_and_remove_keep_counters_in_step(self):
+        self.assertEqual(self.react('like'), (200, {'likes': 1, 'dislikes': 0}))
+        self.assertEqual(self.react('like'), (200, {'likes': 1, 'dislikes': 0}))
+        self.assertEqual(self.react('dislike'), (200, {'likes': 0, 'dislikes': 1}))
+        self.assertEqual(self.react('remove'), (200, {'likes': 0, 'dislikes': 0}))
+        self.assertFalse(TopicReaction.objects.filter(topic=self.topic).exists())
+        self.assertEqual(self.react('bogus')[0], 400)
+
+    def test_reconcile_command_repairs_drift(self):
+        TopicReaction.react(self.topic, self.voters[0], True)
+        TopicReaction.objects.create(topic=self.topic, user=self.voters[1], is_like=False)
+        Topic.objects.filter(pk=self.topic.pk).update(like_count=7)
+
+        out = StringIO()
+        call_command('reconcile_reaction_counts', stdout=out)
+
+        self.topic.refresh_from_db()
+        self.assertEqual((self.topic.like_count, self.topic.dislike_count), (1, 1))
+        self.assertIn('1 topic(s) fixed', out.getvalue())
+
+
+class CommentStatsTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.topic = Topic.objects.create(tutorial=self.tutorial, title='Loops', content='<p>Body</p>')
+
+    def make_comments(self, count):
+        for i in range(count):
+            comment = Comment.objects.create(topic=self.topic, user=self.voters[i % 2], content=f'Comment {i}')
+            comment.likes.add(self.voters[0], self.voters[1])
+            comment.dislikes.add(self.user)
+
+    def test_comment_list_query_count_is_constant(self):
+        url = reverse('comment-list', kwargs={'topic_slug': self.topic.slug})
+        self.make_comments(3)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.make_comments(30)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'page_size': 50})
+
+        self.assertEqual(len(response.data['results']), 33)
+        comment = response.data['results'][0]
+        self.assertEqual((comment['total_likes'], comment['total_dislikes']), (2, 1))
+        self.assertEqual(comment['my_reaction'], 'dislike')
+
+    def test_reaction_response_reflects_requesting_user(self):
+        comment = Comment.objects.create(topic=self.topic, user=self.voters[0], content='Hi')
+        url = reverse('comment-reaction', kwargs={'comment_id': comment.pk})
+
+        data = self.client.post(url, {'action': 'like'}, format='json').data
+        self.assertEqual((data['total_likes'], data['total_dislikes'], data['my_reaction']), (1, 0, 'like'))
+
+        data = self.client.post(url, {'action': 'dislike'}, format='json').data
+        self.assertEqual((data['total_likes'], data['total_dislikes'], data['my_reaction']), (0, 1, 'dislike'))
+
+
+class TopicDetailCommentsTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.topic = Topic.objects.create(tutorial=self.tutorial, title='Loops', content='<p>Body</p>')
+        for i in range(15):
+            Comment.objects.create(topic=self.topic, user=self.voters[0], content=f'Comment {i}')
+        self.url = reverse('topic-detail', kwargs={'slug': self.topic.slug})
+        self.addCleanup(view_counts.reset_buffer)
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_embeds_newest_comments_with_cursor(self):
+        # validators, topic, comments page
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        comments = response.data['comments']
+        self.assertEqual(len(comments['results']), 10)
+        self.assertEqual(comments['results'][0]['content'], 'Comment 14')
+
+        rest = self.client.get(comments['next']).data
+        self.assertEqual([c['content'] for c in rest['results']], [f'Comment {i}' for i in range(4, -1, -1)])
+
+    @override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_include_switch_skips_comments(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'include': ''})
+        self.assertNotIn('comments', response.data)
+        self.assertIn('comments', self.client.get(self.url, {'include': 'comments'}).data)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class ConditionalGetTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(view_counts.reset_buffer)
+        self.topic = self.make_topics(1)[0]
+
+    def test_topic_detail_revalidates_with_one_query(self):
+        url = reverse('topic-detail', kwargs={'slug': self.topic.slug})
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(view_counts.pending_views(self.topic), 2)
+
+        Comment.objects.filter(topic=self.topic).first().likes.add(self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_tutorial_detail_etag_tracks_topic_reactions(self):
+        url = reverse('tutorial-detail', kwargs={'slug': self.tutorial.slug})
+        response = self.client.get(url)
+        etag = response['ETag']
+        # Topic deletions would not move any timestamp, so there is no Last-Modified
+        self.assertNotIn('Last-Modified', response)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        TopicReaction.react(self.topic, self.user, True)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_never_hides_counter_changes(self):
+        # Last-Modified has one-second resolution; start well in the past
+        Topic.objects.filter(pk=self.topic.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        url = reverse('topic-detail', kwargs={'slug': self.topic.slug})
+
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        Comment.objects.create(topic=self.topic, user=self.user, content='Late')
+        Comment.objects.filter(topic=self.topic).first().likes.add(self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time())).status_code, 200)
+
+        # Without comments only the topic row is shown, and reactions move its updated_at
+        last_modified = self.client.get(url, {'omit': 'comments'})['Last-Modified']
+        self.assertEqual(self.client.get(url, {'omit': 'comments'}, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        TopicReaction.react(self.topic, self.user, True)
+        self.assertEqual(self.client.get(url, {'omit': 'comments'}, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class SparseFieldsetTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(view_counts.reset_buffer)
+        self.topic = self.make_topics(1)[0]
+
+    def test_topic_fields_select_columns_and_skip_comments(self):
+        url = reverse('topic-detail', kwargs={'slug': self.topic.slug})
+        # validators, topic
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title,reactions,views'})
+
+        self.assertEqual(set(response.data), {'title', 'reactions', 'views'})
+        self.assertEqual(response.data['views'], 1)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"content"', queries.captured_queries[1]['sql'])
+
+        response = self.client.get(url, {'omit': 'content,comments'})
+        self.assertNotIn('content', response.data)
+        self.assertNotIn('comments', response.data)
+        self.assertIn('reactions', response.data)
+
+    def test_tutorial_omit_topics_skips_prefetch(self):
+        url = reverse('tutorial-detail', kwargs={'slug': self.tutorial.slug})
+        # validators, tutorial
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'omit': 'topics,total_topics'})
+        self.assertNotIn('topics', response.data)
+        self.assertEqual(response.data['title'], 'Python')
+
+    def test_problem_without_topic_skips_join(self):
+        problem = Problems.objects.create(topic=self.topic, title='Sum', question='Add them')
+        url = reverse('problem-detail', kwargs={'slug': problem.slug})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title,question,unknown'})
+
+        self.assertEqual(response.data, {'title': 'Sum', 'question': 'Add them'})
+        self.assertNotIn('tutorials_topic', queries.captured_queries[-1]['sql'])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url).data['topic'], 'Python - Lesson 0')
+
+
+class ContentImportExportTests(TutorialTestMixin, TestCase):
+    def test_round_trip_upserts_by_slug(self):
+        topic = Topic.objects.create(tutorial=self.tutorial, title='Loops', content='<p>Old</p>')
+        Problems.objects.create(topic=topic, title='Sum a list', question='Add them up')
+
+        exported = StringIO()
+        call_command('export_content', stdout=exported, stderr=StringIO())
+        lines = exported.getvalue().splitlines()
+        self.assertEqual([json.loads(line)['type'] for line in lines], ['tutorial', 'topic', 'problem'])
+
+        topic.content = '<p>Changed locally</p>'
+        topic.save()
+        new_topic = {'type': 'topic', 'slug': 'loops-2', 'tutorial': self.tutorial.slug,
+                     'title': 'More loops', 'content': '<p>New</p>', 'video_url': None}
+        orphan = dict(json.loads(lines[2]), topic='missing', slug='orphan')
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(lines + [json.dumps(new_topic), json.dumps(orphan)]) + '\n')
+        self.addCleanup(os.remove, f.name)
+
+        out = StringIO()
+        call_command('import_content', f.name, '--batch-size', '1', stdout=out, stderr=StringIO())
+
+        topic.refresh_from_db()
+        self.assertEqual(topic.content, '<p>Old</p>')
+        self.assertEqual(Topic.objects.get(slug='loops-2').title, 'More loops')
+        self.assertEqual((Tutorial.objects.count(), Problems.objects.count()), (1, 1))
+        self.assertIn('topic: 1 created, 1 updated', out.getvalue())
+        self.assertIn('problem: 0 created, 1 updated, 1 skipped', out.getvalue())
+
+    def test_records_missing_required_fields_are_skipped(self):
+        records = [
+            {'type': 'topic', 'slug': 'no-content', 'tutorial': self.tutorial.slug, 'title': 'Empty'},
+            {'type': 'topic', 'slug': 'complete', 'tutorial': self.tutorial.slug, 'title': 'Full', 'content': '<p>Body</p>'},
+            {'type': 'tutorial', 'slug': 'go', 'title': 'Go', 'description': '<p>Intro</p>', 'thumbnail': None},
+        ]
+        counts = Importer().run(json.dumps(record) for record in records)
+
+        self.assertEqual(counts['topic'], {'created': 1, 'updated': 0, 'skipped': 1})
+        self.assertEqual(counts['tutorial']['created'], 1)
+        self.assertFalse(Topic.objects.filter(slug='no-content').exists())
+        self.assertEqual(Tutorial.objects.get(slug='go').thumbnail.name, '')
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class ActivityFeedTests(TutorialTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        view_counts.reset_buffer()
+        self.addCleanup(view_counts.reset_buffer)
+        self.topic, = self.make_topics(1)
+        self.comment = Comment.objects.get(topic=self.topic)
+
+    def test_reactions_and_views_do_not_insert_synchronously(self):
+        requests = [
+            lambda: self.client.get(reverse('topic-detail', kwargs={'slug': self.topic.slug})),
+            lambda: self.client.post(reverse('comment-reaction', kwargs={'comment_id': self.comment.pk}), {'action': 'like'}),
+        ]
+        for request in requests:
+            with CaptureQueriesContext(connection) as queries:
+                request()
+            self.assertFalse([q for q in queries if 'tutorials_useractivity' in q['sql']])
+        self.assertEqual(UserActivity.objects.count(), 0)
+        self.assertEqual(activity.pending(), 2)
+
+    def test_feed_lists_flushed_events_newest_first(self):
+        detail = reverse('topic-detail', kwargs={'slug': self.topic.slug})
+        self.client.get(detail)
+        self.client.get(detail)  # Repeat views within a flush are recorded once
+        self.client.post(reverse('comment-list', kwargs={'topic_slug': self.topic.slug}), {'content': 'Thanks'})
+        self.client.post(reverse('topic-reaction', kwargs={'topic_slug': self.topic.slug}), {'action': 'like'})
+        self.client.post(reverse('comment-reaction', kwargs={'comment_id': self.comment.pk}), {'action': 'dislike'})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(activity.flush(), 4)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('INSERT')]), 1)
+
+        url = reverse('my-activity')
+        page = self.client.get(url, {'page_size': 3}).data
+        self.assertEqual([e['activity_type'] for e in page['results']], ['dislike', 'topic_like', 'comment'])
+        self.assertEqual(page['results'][0]['topic_slug'], self.topic.slug)
+        rest = self.client.get(page['next']).data
+        self.assertEqual([e['activity_type'] for e in rest['results']], ['view'])
+        self.assertIsNone(rest['next'])
+
+
+class ActivityFlushTests(TutorialTestMixin, TransactionTestCase):
+    # SQLite checks foreign keys at commit, which only happens outside TestCase
+
+    def test_events_for_deleted_rows_are_kept_without_them(self):
+        topic, = self.make_topics(1)
+        comment = Comment.objects.get(topic=topic)
+        activity.record_activity(self.user.pk, 'like', topic_id=topic.pk, comment_id=comment.pk)
+        activity.record_activity(self.voters[1].pk, 'view', topic_id=topic.pk)
+        comment.delete()
+        self.voters[1].delete()
+
+        self.assertEqual(activity.flush(), 2)
+        event = UserActivity.objects.get()
+        self.assertEqual((event.user, event.topic, event.comment), (self.user, topic, None))
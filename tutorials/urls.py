@@ -3,7 +3,7 @@ from .views import (
     TutorialListView, TutorialDetailView,
     TopicListView, TopicDetailView,
     CommentListCreateView, CommentDetailView,
-    CommentReactionView, TopicReactionView, MyCommentsView,
+    CommentReactionView, TopicReactionView, MyCommentsView, MyActivityView,
     ProblemListView, ProblemDetailView, ProblemsListAPIView,
 )
 
@@ -17,6 +17,7 @@ urlpatterns = [
     path('comments/<int:comment_id>/reaction/', CommentReactionView.as_view(), name='comment-reaction'),
     path('topics/<slug:topic_slug>/reaction/', TopicReactionView.as_view(), name='topic-reaction'),
     path('my-comments/', MyCommentsView.as_view(), name='my-comments'),
+    path('my-activity/', MyActivityView.as_view(), name='my-activity'),
 
     path('topics/<slug:topic_slug>/problems/', ProblemListView.as_view(), name='problem-list'),
     path('problems/<slug:slug>/', ProblemDetailView.as_view(), name='problem-detail'),
@@ -1,7 +1,16 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from .models import Tutorial, Topic, Comment, TopicReaction
+from django.urls import reverse
+from django.db.models import Count, Max, Prefetch, Sum
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalGetMixin, child_aggregate, latest
+from core.fieldsets import SparseQuerysetMixin
+from core.pagination import CreatedAtPagination
+from core.view_counts import record, record_view
+from .activity import record_activity
+from .models import Tutorial, Topic, Comment, TopicReaction, UserActivity
 from .serializers import *
 
 
@@ -10,17 +19,43 @@ from .serializers import *
 # ======================
 
 class TutorialListView(generics.ListAPIView):
-    queryset = Tutorial.objects.all()
+    queryset = Tutorial.objects.list_mode().with_topic_counts()
     serializer_class = TutorialListSerializer
     permission_classes = [permissions.IsAuthenticated]  # login required
+    pagination_class = CreatedAtPagination
 
 
-class TutorialDetailView(generics.RetrieveAPIView):
-    queryset = Tutorial.objects.all()
+class TutorialDetailView(SparseQuerysetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     serializer_class = TutorialDetailSerializer
     permission_classes = [permissions.IsAuthenticated]  # login required
     lookup_field = "slug"
 
+    def get_queryset(self):
+        queryset = Tutorial.objects.all()
+        if self.wants('total_topics'):
+            queryset = queryset.with_topic_counts()
+        if self.wants('topics'):
+            queryset = queryset.prefetch_related(
+                Prefetch('topics', queryset=Topic.objects.list_mode().with_counts())
+            )
+        return self.restrict_columns(queryset)
+
+    def get_validators(self):
+        row = Tutorial.objects.filter(slug=self.kwargs['slug']).values('pk', 'updated_at').annotate(
+            topics_updated=child_aggregate(Topic.objects, 'tutorial', Max('updated_at')),
+            topics_total=child_aggregate(Topic.objects, 'tutorial', Count('pk')),
+            topic_likes=child_aggregate(Topic.objects, 'tutorial', Sum('like_count')),
+            topic_dislikes=child_aggregate(Topic.objects, 'tutorial', Sum('dislike_count')),
+            comments_total=child_aggregate(Comment.objects, 'topic__tutorial', Count('pk')),
+        ).first()
+        if row is None:
+            return None
+        last_modified = row['updated_at']
+        if self.wants('topics') or self.wants('total_topics'):
+            # Deleted topics and comments change the counts without leaving a timestamp
+            last_modified = None
+        return row, last_modified, sorted(row.items())
+
 
 # ======================
 # Topics (READ ONLY but Auth Required)
@@ -32,22 +67,81 @@ class TopicListView(generics.ListAPIView):
 
     def get_queryset(self):
         tutorial_slug = self.kwargs['tutorial_slug']
-        return Topic.objects.filter(tutorial__slug=tutorial_slug)
+        return Topic.objects.filter(tutorial__slug=tutorial_slug).list_mode().with_counts()
+
 
+class TopicCommentsPagination(CreatedAtPagination):
+    page_size = settings.TOPIC_DETAIL_COMMENTS
+    page_size_query_param = None
 
-class TopicDetailView(generics.RetrieveAPIView):
-    queryset = Topic.objects.all()
+
+class TopicDetailView(SparseQuerysetMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    Topic with its newest comments. The embedded `comments.next` link continues
+    in CommentListCreateView; pass `?include=` without `comments` (or
+    `?omit=comments`) to skip them.
+    """
     serializer_class = TopicSerializer
     permission_classes = [permissions.IsAuthenticated]  # login required
     lookup_field = "slug"
 
+    def get_queryset(self):
+        return self.restrict_columns(Topic.objects.all())
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.views += 1
-        instance.save(update_fields=["views"])
-        serializer = self.get_serializer(instance)
+        pending = record_view(instance)
+        record_activity(request.user.pk, 'view', topic_id=instance.pk)
+        if self.wants('views'):
+            instance.views += pending
+        context = self.get_serializer_context()
+        if self.includes('comments'):
+            context['comments'] = self.get_comments_page(instance)
+        serializer = self.get_serializer_class()(instance, context=context)
         return Response(serializer.data)
 
+    def get_validators(self):
+        rows = Topic.objects.filter(slug=self.kwargs['slug']).values(
+            'pk', 'updated_at', 'like_count', 'dislike_count'
+        )
+        parts = []
+        if self.includes('comments'):
+            # The embedded page carries per-comment totals and the reader's own reaction
+            rows = rows.annotate(
+                comments_updated=child_aggregate(Comment.objects, 'topic', Max('updated_at')),
+                comments_total=child_aggregate(Comment.objects, 'topic', Count('pk')),
+                comment_likes=child_aggregate(Comment.likes.through.objects, 'comment__topic', Count('pk')),
+                comment_dislikes=child_aggregate(Comment.dislikes.through.objects, 'comment__topic', Count('pk')),
+            )
+            parts.append(('user', self.request.user.pk))
+        row = rows.first()
+        if row is None:
+            return None
+        # Comment likes and deletions leave no timestamp; the embedded page is
+        # only validated by the ETag
+        last_modified = None if self.includes('comments') else row['updated_at']
+        return row, last_modified, sorted(row.items()) + parts
+
+    def not_modified(self, row):
+        record(Topic, row['pk'])
+        record_activity(self.request.user.pk, 'view', topic_id=row['pk'])
+
+    def includes(self, section):
+        include = self.request.query_params.get('include')
+        return self.wants(section) and (include is None or section in include.split(','))
+
+    def get_comments_page(self, topic):
+        paginator = TopicCommentsPagination()
+        paginator.base_url = self.request.build_absolute_uri(
+            reverse('comment-list', kwargs={'topic_slug': self.kwargs['slug']})
+        )
+        comments = Comment.objects.filter(topic=topic).with_stats(self.request.user)
+        page = paginator.paginate_queryset(comments, self.request, view=self)
+        return {
+            'results': CommentSerializer(page, many=True).data,
+            'next': paginator.get_next_link(),
+        }
+
 
 # ======================
 # Comments (CRUD - Auth Required)
@@ -56,15 +150,18 @@ class TopicDetailView(generics.RetrieveAPIView):
 class CommentListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]  # login required
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
         topic_slug = self.kwargs['topic_slug']
-        return Comment.objects.filter(topic__slug=topic_slug)
+        return Comment.objects.filter(topic__slug=topic_slug).with_stats(self.request.user)
 
     def perform_create(self, serializer):
         topic_slug = self.kwargs['topic_slug']
         topic = get_object_or_404(Topic, slug=topic_slug)
-        serializer.save(user=self.request.user, topic=topic)
+        comment = serializer.save(user=self.request.user, topic=topic)
+        record_activity(self.request.user.pk, 'comment', topic_id=topic.pk, comment_id=comment.pk)
+        serializer.instance = Comment.objects.with_stats(self.request.user).get(pk=comment.pk)
 
 
 class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -72,7 +169,7 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]  # login required
 
     def get_queryset(self):
-        return Comment.objects.all()
+        return Comment.objects.with_stats(self.request.user)
 
     def perform_update(self, serializer):
         if self.get_object().user != self.request.user:
@@ -104,7 +201,9 @@ class CommentReactionView(generics.GenericAPIView):
             comment.likes.remove(request.user)
         else:
             return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
+        record_activity(request.user.pk, action, topic_id=comment.topic_id, comment_id=comment.pk)
 
+        comment = Comment.objects.with_stats(request.user).get(pk=comment.pk)
         return Response(CommentSerializer(comment).data, status=status.HTTP_200_OK)
 
 
@@ -119,34 +218,40 @@ class TopicReactionView(generics.GenericAPIView):
         action = request.data.get('action')
         topic = get_object_or_404(Topic, slug=topic_slug)
 
-        # Ensure the reaction exists (default is_like=False)
-        reaction, _ = TopicReaction.objects.get_or_create(
-            topic=topic,
-            user=request.user,
-            defaults={"is_like": False}
-        )
-
-        if action == "like":
-            reaction.is_like = True
-        elif action == "dislike":
-            reaction.is_like = False
-        else:
+        reactions = {"like": True, "dislike": False, "remove": None}
+        if action not in reactions:
             return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
 
-        reaction.save()
+        TopicReaction.react(topic, request.user, reactions[action])
+        if reactions[action] is not None:
+            record_activity(request.user.pk, f'topic_{action}', topic_id=topic.pk)
+        topic.refresh_from_db(fields=["like_count", "dislike_count"])
 
         return Response({
-            "likes": topic.reactions.filter(is_like=True).count(),
-            "dislikes": topic.reactions.filter(is_like=False).count()
+            "likes": topic.like_count,
+            "dislikes": topic.dislike_count
         })
 
 
 class MyCommentsView(generics.ListAPIView):
     serializer_class = UserCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
+
+    def get_queryset(self):
+        return Comment.objects.filter(user=self.request.user).with_stats().order_by('-created_at')
+
+
+class MyActivityView(generics.ListAPIView):
+    """The reader's own activity, newest first, from the buffered UserActivity log."""
+    serializer_class = UserActivitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
-        return Comment.objects.filter(user=self.request.user).order_by('-created_at')
+        return UserActivity.objects.filter(user=self.request.user).select_related('topic').only(
+            'id', 'activity_type', 'created_at', 'comment_id', 'topic__title', 'topic__slug',
+        )
 
 class ProblemListView(generics.ListAPIView):
     """
@@ -154,20 +259,40 @@ class ProblemListView(generics.ListAPIView):
     """
     serializer_class = ProblemListSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
         topic_slug = self.kwargs.get('topic_slug')
-        return Problems.objects.filter(topic__slug=topic_slug).order_by('-created_at')
+        return Problems.objects.filter(topic__slug=topic_slug).only('id', 'title', 'slug', 'created_at').order_by('-created_at')
 
 
-class ProblemDetailView(generics.RetrieveAPIView):
+class ProblemDetailView(SparseQuerysetMixin, ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
     """
     Retrieve details of a specific problem by slug.
     """
-    queryset = Problems.objects.all()
     serializer_class = ProblemDetailSerializer
     lookup_field = 'slug'
+    cache_namespaces = ('problems',)
+
+    def get_queryset(self):
+        queryset = Problems.objects.all()
+        if self.wants('topic'):
+            queryset = queryset.select_related('topic__tutorial')
+        return self.restrict_columns(queryset)
+
+    def get_validators(self):
+        # The topic is rendered as "<tutorial title> - <topic title>"
+        row = Problems.objects.filter(slug=self.kwargs['slug']).values(
+            'pk', 'updated_at', 'topic__updated_at', 'topic__tutorial__updated_at'
+        ).first()
+        if row is None:
+            return None
+        last_modified = latest(row['updated_at'], row['topic__updated_at'], row['topic__tutorial__updated_at'])
+        return row, last_modified, sorted(row.items())
 
 class ProblemsListAPIView(generics.ListAPIView):
-    queryset = Problems.objects.select_related('topic', 'topic__tutorial').all()
-    serializer_class = ProblemsSerializer
\ No newline at end of file
+    queryset = Problems.objects.select_related('topic__tutorial').only(
+        'id', 'title', 'slug', 'created_at', 'updated_at', 'topic__title', 'topic__tutorial__title'
+    )
+    serializer_class = ProblemsSerializer
+    pagination_class = CreatedAtPagination
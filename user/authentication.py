@@ -0,0 +1,133 @@
+"""
+JWT authentication that skips the ``User`` query on the hot path.
+
+``CachedJWTAuthentication`` keeps recently authenticated users in a small
+per-process LRU (``AUTH_USER_CACHE_SIZE`` entries, ``AUTH_USER_CACHE_TTL``
+seconds). Each entry remembers the user's version stamp from the shared cache
+(``AUTH_USER_CACHE_ALIAS``). ``user.signals`` replaces that stamp whenever the
+row is saved or deleted, or its groups or permissions change, so a
+deactivated user or a new password takes effect on the next request in every
+process that shares the cache. A cache hit costs one cache read instead of a
+database query.
+
+Writes that bypass signals (``QuerySet.update()``) must call
+``user_cache.invalidate(pk)`` themselves; otherwise the TTL bounds how long a
+stale row is served.
+"""
+import copy
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+KEY_PREFIX = 'authuser'
+ALL_USERS = 'all'
+
+
+class UserCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+    def _version_key(self, pk):
+        return f'{KEY_PREFIX}:v:{pk}'
+
+    def versions(self, pk):
+        """
+        The global and per-user stamps. A missing stamp is created rather than
+        read as a default, so an evicted stamp can never match an old entry.
+        """
+        keys = [self._version_key(ALL_USERS), self._version_key(pk)]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, uuid.uuid4().hex, timeout=None)
+                found[key] = self.cache.get(key)
+        return tuple(found[key] for key in keys)
+
+    def get(self, pk):
+        """``(user or None, versions)``; pass ``versions`` back to ``put()`` after a miss."""
+        pk = str(pk)  # Tokens may carry the id as a string
+        versions = self.versions(pk)
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None, versions
+            user, stamp, expires = entry
+            if stamp != versions or expires < time.monotonic():
+                del self._entries[pk]
+                self._stats['stale' if stamp != versions else 'expired'] += 1
+                return None, versions
+            self._entries.move_to_end(pk)
+            self._stats['hits'] += 1
+        # Each request gets its own instance; views may modify request.user
+        return copy.copy(user), versions
+
+    def put(self, pk, user, versions):
+        pk = str(pk)
+        expires = time.monotonic() + getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+        with self._lock:
+            self._entries[pk] = (copy.copy(user), versions, expires)
+            self._entries.move_to_end(pk)
+            while len(self._entries) > getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024):
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, pk=ALL_USERS):
+        """Give ``pk`` (default: every user) a new stamp, in all processes sharing the cache."""
+        self.cache.set(self._version_key(pk), uuid.uuid4().hex, timeout=None)
+        with self._lock:
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """{'hits', 'misses', 'stale', 'expired', 'evictions', 'invalidations', 'hit_ratio', 'size'} for this process."""
+        with self._lock:
+            result = {key: self._stats[key] for key in ('hits', 'misses', 'stale', 'expired', 'evictions', 'invalidations')}
+            lookups = result['hits'] + result['misses'] + result['stale'] + result['expired']
+            result['hit_ratio'] = result['hits'] / lookups if lookups else 0.0
+            result['size'] = len(self._entries)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user, versions = user_cache.get(user_id)
+        if user is None:
+            # Queries and runs simplejwt's checks; only users that pass are cached
+            user = super().get_user(validated_token)
+            user_cache.put(user_id, user, versions)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
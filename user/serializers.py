@@ -5,10 +5,13 @@ from django.contrib.auth.password_validation import validate_password, Validatio
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import password_validation
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import urlsafe_base64_decode
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .tasks import send_password_reset_email
+from .tokens import CachedRefreshToken, RotatingRefreshToken
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -59,17 +62,10 @@ class PasswordResetRequestSerializer(serializers.Serializer):
 
     
     def send_reset_email(self, email):
+        # Sent by the task worker, which builds the link: a reset token is never
+        # stored in the tasks table or the outbox
         user = get_user_model().objects.get(email=email)
-        uid = urlsafe_base64_encode(str(user.pk).encode('utf-8'))  # <-- Convert user.pk to string and then encode
-        token = default_token_generator.make_token(user)
-        reset_link = f"http://127.0.0.1:8000/reset-password/{uid}/{token}/"
-
-        send_mail(
-        "Password Reset Request",
-        f"Click the following link to reset your password: {reset_link}",
-        "no-reply@yourdomain.com",
-        [email]
-    )
+        send_password_reset_email.delay(user.pk)
 
 
 class PasswordResetSerializer(serializers.Serializer):
@@ -114,4 +110,13 @@ class ChangePasswordSerializer(serializers.Serializer):
         except ValidationError as e:
             raise serializers.ValidationError({"new_password": e.messages})
         
-        return data
\ No newline at end of file
+        return data
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    @property
+    def token_class(self):
+        # With rotation the old token is blacklisted at once, and that insert rejects reuse
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            return RotatingRefreshToken
+        return CachedRefreshToken
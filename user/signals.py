@@ -0,0 +1,42 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, update_fields=None, **kwargs):
+    # LoginView only stamps last_login, which nothing reads from request.user
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        user_cache.invalidate(instance.pk)
+    elif pk_set is None:
+        # A group or permission was cleared from every user
+        user_cache.invalidate()
+    else:
+        for pk in pk_set:
+            user_cache.invalidate(pk)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_delete, sender=Group)
+def invalidate_group_members(sender, action='post_delete', **kwargs):
+    # Which users a group reaches is not worth a query; every stamp changes
+    if action.startswith('post_'):
+        user_cache.invalidate()
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.utils.http import urlsafe_base64_encode
+
+from tasks.queue import task
+
+
+@task
+def send_password_reset_email(user_id):
+    # The token is made here rather than queued, so it never sits in the tasks table
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    uid = urlsafe_base64_encode(str(user.pk).encode('utf-8'))
+    token = default_token_generator.make_token(user)
+    reset_link = f"http://127.0.0.1:8000/reset-password/{uid}/{token}/"
+
+    send_mail(
+        "Password Reset Request",
+        f"Click the following link to reset your password: {reset_link}",
+        "no-reply@yourdomain.com",
+        [user.email]
+    )
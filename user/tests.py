@@ -1,3 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache
+from .models import User
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pass1234!')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.url = reverse('my-comments')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        lookups = [q['sql'] for q in queries if 'FROM "user_user" WHERE "user_user"."id"' in q['sql']]
+        return response.status_code, len(lookups)
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.assertEqual(self.user_queries(), (200, 1))
+        self.assertEqual(self.user_queries(), (200, 0))
+        self.assertEqual(self.user_queries(), (200, 0))
+
+        stats = user_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3)
+
+    def test_deactivation_applies_on_the_next_request(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user_queries(), (401, 1))
+        self.assertEqual(user_cache.stats()['stale'], 1)
+
+    def test_permission_changes_and_logins(self):
+        self.user_queries()
+        self.user.user_permissions.add(Permission.objects.first())
+        self.assertEqual(self.user_queries(), (200, 1))
+
+        # Stamping last_login keeps the cached row
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.user_queries(), (200, 0))
+
+    def test_cached_users_are_not_shared_between_requests(self):
+        self.user_queries()
+        first, _ = user_cache.get(self.user.pk)
+        first.username = 'changed'
+        second, _ = user_cache.get(self.user.pk)
+        self.assertEqual(second.username, 'reader')
+
+
+class RefreshTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pass1234!')
+        self.client = APIClient()
+        self.url = reverse('token_refresh')
+
+    def test_rotation_blacklists_with_one_insert_and_rejects_reuse(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(writes), 2)  # Blacklist the old token, record the new one
+        self.assertFalse(any('token_blacklist_blacklistedtoken' in q['sql'] and q['sql'].startswith('SELECT') for q in queries))
+
+        # Rejected from the cache...
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post(self.url, {'refresh': refresh}, format='json').status_code, 400)
+        # ...and by the unique insert when the cache does not know the token
+        cache.clear()
+        self.assertEqual(self.client.post(self.url, {'refresh': refresh}, format='json').status_code, 400)
+
+        rotated = response.json()['refresh']
+        self.assertEqual(self.client.post(self.url, {'refresh': rotated}, format='json').status_code, 200)
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        for _ in range(5):
+            RefreshToken.for_user(self.user)
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(days=1))
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.first())
+        live = OutstandingToken.objects.get(jti=RefreshToken.for_user(self.user)['jti'])
 
-# Create your tests here.
+        out = StringIO()
+        call_command('prune_tokens', batch_size=2, stdout=out, stderr=StringIO())
+        self.assertIn('5 expired token(s) deleted', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.all()), [live])
+        self.assertFalse(BlacklistedToken.objects.exists())
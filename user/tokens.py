@@ -0,0 +1,110 @@
+"""
+Refresh tokens with a cheaper blacklist.
+
+simplejwt checks the blacklist with a join, then blacklists with a user
+lookup and two ``get_or_create`` calls, and then records the rotated token
+with another user lookup and ``get_or_create``. Here:
+
+* Blacklisted jtis are also kept in the cache until the token would have
+  expired anyway, so a replayed token is rejected without a query.
+* Blacklisting is one ``INSERT ... SELECT`` keyed on the outstanding token's
+  unique jti. ``BlacklistedToken.token`` is unique, so a second insert for
+  the same jti fails: the write doubles as the membership check.
+  ``RotatingRefreshToken`` relies on that and skips the database check in
+  ``verify()``.
+* The rotated token gets a fresh jti, so it is recorded with a plain INSERT.
+
+Expired rows are removed by ``manage.py prune_tokens``.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+KEY_PREFIX = 'jwtbl'
+
+
+class BlacklistCache:
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'TOKEN_BLACKLIST_CACHE_ALIAS', 'default')]
+
+    def add(self, jti, exp):
+        # Once the token has expired it is rejected anyway, so the entry may go
+        timeout = max(int(exp - time.time()), 1)
+        self.cache.set(f'{KEY_PREFIX}:{jti}', True, timeout)
+
+    def __contains__(self, jti):
+        return self.cache.get(f'{KEY_PREFIX}:{jti}', False)
+
+
+blacklisted_jtis = BlacklistCache()
+
+
+def insert_blacklisted(jti):
+    """
+    Blacklist the outstanding token ``jti`` in one statement. Returns False if
+    no such outstanding token exists; raises IntegrityError if it is already
+    blacklisted.
+    """
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {blacklist} ({token_id}, {blacklisted_at}) SELECT {id}, %s FROM {outstanding} WHERE {jti} = %s'.format(
+        blacklist=quote(BlacklistedToken._meta.db_table),
+        token_id=quote(BlacklistedToken._meta.get_field('token').column),
+        blacklisted_at=quote(BlacklistedToken._meta.get_field('blacklisted_at').column),
+        id=quote(OutstandingToken._meta.pk.column),
+        outstanding=quote(OutstandingToken._meta.db_table),
+        jti=quote(OutstandingToken._meta.get_field('jti').column),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [timezone.now(), jti])
+        return cursor.rowcount > 0
+
+
+class CachedRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in blacklisted_jtis:
+            raise TokenError(_("Token is blacklisted"))
+        super().check_blacklist()
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        try:
+            inserted = insert_blacklisted(jti)
+        except IntegrityError:
+            blacklisted_jtis.add(jti, self.payload['exp'])
+            raise TokenError(_("Token is blacklisted"))
+        if not inserted:
+            # Issued before outstanding tokens were recorded, or already pruned
+            super().blacklist()
+        blacklisted_jtis.add(jti, self.payload['exp'])
+
+    def outstand(self):
+        # Only called right after set_jti(), so the row cannot exist yet
+        return OutstandingToken.objects.create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            created_at=self.current_time,
+            token=str(self),
+            expires_at=datetime_from_epoch(self.payload['exp']),
+        )
+
+
+class RotatingRefreshToken(CachedRefreshToken):
+    """
+    For refresh with BLACKLIST_AFTER_ROTATION: the token is blacklisted right
+    after it is verified, and that insert rejects reused tokens, so ``verify()``
+    only consults the cache.
+    """
+
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in blacklisted_jtis:
+            raise TokenError(_("Token is blacklisted"))
@@ -7,6 +7,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from .serializers import *
 from django.utils import timezone  # Add this import at the top
+from core.ratelimit import RateLimitMixin
+from .tokens import CachedRefreshToken
 
 # Configure logger
 logger = logging.getLogger('backend')
@@ -20,9 +22,10 @@ def get_tokens_for_user(user):
     }
 
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(RateLimitMixin, generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
+    rate_limit_scope = 'register'
 
     def post(self, request, *args, **kwargs):
         logger.info("Register attempt: email=%s", request.data.get("email"))
@@ -36,9 +39,10 @@ class RegisterView(generics.CreateAPIView):
 
 
 
-class LoginView(generics.GenericAPIView):
+class LoginView(RateLimitMixin, generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    rate_limit_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         email = request.data.get("email")
@@ -62,6 +66,7 @@ class LoginView(generics.GenericAPIView):
 
 class CustomTokenRefreshView(TokenRefreshView):
     permission_classes = [AllowAny]
+    serializer_class = TokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
         logger.info("Token refresh attempt")
@@ -87,7 +92,7 @@ class LogoutView(APIView):
         logger.info("Logout attempt: user_id=%s", user.id)
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             token.blacklist()
             logger.info("Logout successful: user_id=%s", user.id)
             return Response({"detail": "Logout successful"}, status=status.HTTP_200_OK)
@@ -95,8 +100,9 @@ class LogoutView(APIView):
             logger.error("Logout failed for user_id=%s: %s", user.id, str(e))
             return Response({"error": "Invalid token or already blacklisted"}, status=status.HTTP_400_BAD_REQUEST)
 
-class PasswordResetRequestView(generics.GenericAPIView):
+class PasswordResetRequestView(RateLimitMixin, generics.GenericAPIView):
     serializer_class = PasswordResetRequestSerializer
+    rate_limit_scope = 'password_reset'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)